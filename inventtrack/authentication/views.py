@@ -8,7 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from .serializers import UserSerializer
 from .models import User
 from common.jwt_helpers import PermissionsAssigning
-from common.jwt_helpers import check_permissions
+from common.jwt_helpers import HasTokenPermissions
 from common.log_utils import LoggerUtility
 
 logger_utility = LoggerUtility()
@@ -35,9 +35,11 @@ class UserUpdating(APIView):
     """
     API View for updating an existing user.
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'PUT': ['update_user'],
+    }
 
-    @check_permissions(['update_user'])
     def put(self, request, pk):
         """
         Handle PUT request to update an existing user.
@@ -0,0 +1,169 @@
+"""
+HTTP load generator comparing the same endpoints served over WSGI and over ASGI.
+
+Each target is hit by `--connections` concurrent keep-alive connections for `--duration` seconds,
+using a small asyncio HTTP/1.1 client so the generator itself needs no extra dependencies and is
+not the bottleneck. Start both servers against the same database and cache, e.g.:
+
+    gunicorn inventtrack.wsgi -w 4 --threads 8 -b 127.0.0.1:8000
+    uvicorn inventtrack.asgi:application --workers 4 --port 8001
+
+then run:
+
+    python -m benchmarks.load --token <access token> \\
+        --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001 \\
+        --connections 500 --duration 30 --path '/inventory/item/{id}/' --ids 1-1000
+
+`{id}` in a path is replaced by a random id from `--ids` on every request. Results are printed as
+a table and, with `--output`, written as JSON.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def record(self, status, latency):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else None
+
+        return {
+            'requests': len(latencies),
+            'errors': self.errors,
+            'rps': len(latencies) / elapsed if elapsed else 0,
+            'mean_ms': statistics.fmean(latencies) * 1000 if latencies else None,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'statuses': self.statuses,
+        }
+
+
+async def read_response(reader):
+    """
+    Reads one HTTP/1.1 response and returns its status code, draining a sized or chunked body.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+async def worker(target, paths, ids, token, deadline, stats):
+    """
+    Sends requests over one keep-alive connection until the deadline, reconnecting when needed.
+    """
+    url = urlsplit(target)
+    host, port = url.hostname, url.port or 80
+    reader = writer = None
+    while time.monotonic() < deadline:
+        if writer is None:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                stats.errors += 1
+                await asyncio.sleep(0.1)
+                continue
+
+        path = random.choice(paths).replace('{id}', str(random.randint(*ids)))
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nAuthorization: Bearer {token}\r\n"
+            f"Accept: application/json\r\nConnection: keep-alive\r\n\r\n"
+        )
+        started = time.monotonic()
+        try:
+            writer.write(request.encode())
+            await writer.drain()
+            status, close = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            stats.errors += 1
+            writer.close()
+            reader = writer = None
+            continue
+        stats.record(status, time.monotonic() - started)
+        if close:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def run_target(target, args):
+    stats = Stats()
+    ids = tuple(int(bound) for bound in args.ids.split('-'))
+    deadline = time.monotonic() + args.duration
+    started = time.monotonic()
+    await asyncio.gather(*(
+        worker(target, args.path, ids, args.token, deadline, stats) for _ in range(args.connections)
+    ))
+    return stats.summary(time.monotonic() - started)
+
+
+def format_row(label, result):
+    def number(value):
+        return f"{value:10.1f}" if value is not None else f"{'-':>10}"
+    return (
+        f"{label:<10}{result['requests']:>10}{result['errors']:>8}{number(result['rps'])}"
+        f"{number(result['p50_ms'])}{number(result['p95_ms'])}{number(result['p99_ms'])}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--target', action='append', required=True, help="label=base URL, repeatable")
+    parser.add_argument('--token', required=True, help="JWT access token sent as a Bearer token")
+    parser.add_argument('--path', action='append', help="request path, repeatable; {id} is randomized")
+    parser.add_argument('--ids', default='1-1000', help="inclusive id range for {id}, e.g. 1-1000")
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    args.path = args.path or ['/inventory/item/{id}/']
+
+    results = {}
+    print(f"{'target':<10}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for target in args.target:
+        label, _, base_url = target.partition('=')
+        results[label] = asyncio.run(run_target(base_url, args))
+        print(format_row(label, results[label]))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'connections': args.connections, 'duration': args.duration, 'paths': args.path, 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
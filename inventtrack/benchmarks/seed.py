@@ -0,0 +1,72 @@
+"""
+Bulk seeder for benchmark data volumes (e.g. 10k, 100k or 1M items).
+
+Items are generated in batches and written with `bulk_create`, one transaction per batch. On
+SQLite, journaling and fsync are turned off for the connection while seeding.
+"""
+import random
+from decimal import Decimal
+from django.db import connection, transaction
+from authentication.models import User
+from inventory.models import Category, Item
+
+USER_EMAIL = 'bench@example.com'
+USER_PASSWORD = 'Bench@1234'
+WORDS = (
+    'steel', 'copper', 'brass', 'plastic', 'wooden', 'heavy', 'light', 'compact', 'industrial', 'cordless',
+    'hammer', 'wrench', 'drill', 'saw', 'clamp', 'bolt', 'screw', 'washer', 'bracket', 'hinge',
+)
+
+
+def category_name(index):
+    return f"Category {index:05}"
+
+
+def item_name(index):
+    return f"Item {index:07}"
+
+
+def get_user():
+    """
+    Returns the benchmark superuser, creating it on first use.
+    """
+    user = User.objects.filter(email=USER_EMAIL).first()
+    if user is None:
+        user = User.objects.create_superuser(USER_EMAIL, 'Bench', password=USER_PASSWORD)
+    return user
+
+
+def seed(items, categories, batch_size=5000, seed_value=0, stdout=None):
+    """
+    Creates `categories` categories and `items` items spread across them, owned by the benchmark user.
+    Expects empty inventory tables.
+    """
+    rng = random.Random(seed_value)
+    user = get_user()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous = OFF')
+            cursor.execute('PRAGMA journal_mode = MEMORY')
+
+    with transaction.atomic():
+        Category.objects.bulk_create([Category(name=category_name(i)) for i in range(categories)], batch_size=batch_size)
+    category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+
+    for start in range(0, items, batch_size):
+        batch = [
+            Item(
+                name=item_name(i),
+                sku=f"SKU-{i:07}",
+                description=' '.join(rng.sample(WORDS, 4)),
+                quantity=rng.randint(0, 1000),
+                price=Decimal(rng.randint(100, 100000)) / 100,
+                category_id=category_ids[i % len(category_ids)],
+                created_by=user,
+                updated_by=user,
+            )
+            for i in range(start, min(start + batch_size, items))
+        ]
+        with transaction.atomic():
+            Item.objects.bulk_create(batch, batch_size=batch_size)
+        if stdout is not None:
+            stdout.write(f"  seeded {start + len(batch)}/{items} items\n")
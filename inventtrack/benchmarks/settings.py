@@ -0,0 +1,36 @@
+"""
+Settings for the benchmark suite: the project settings on SQLite and a local-memory cache, as a
+local stand-in for PostgreSQL and Redis. Results are comparable between runs on the same machine
+and data volume, not with production numbers.
+"""
+import os
+import tempfile
+from inventtrack.settings import *  # noqa: F401,F403
+from inventtrack.settings import LOCAL_CACHE
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCHMARK_DB', os.path.join(tempfile.gettempdir(), 'inventtrack-benchmark.sqlite3')),
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 2_000_000},
+    }
+}
+
+LOCAL_CACHE = {**LOCAL_CACHE, 'INVALIDATION_BUS': 'local'}
+
+INVENTORY_ENFORCE_QUERY_BUDGETS = False
+INVENTORY_ASYNC_VIEWS = False
+METRICS_SERVER_TIMING = False
+
+# Request logging goes through the root logger at WARNING, so INFO records are dropped before formatting.
+LOGGING = {'version': 1, 'disable_existing_loggers': False}
@@ -0,0 +1,320 @@
+"""
+In-process benchmark suite for the inventory API, run against SQLite and a local-memory cache
+(`benchmarks.settings`) with a seeded data volume.
+
+Each scenario runs for `--duration` seconds through the full middleware stack with Django's test
+client, or directly against the serializers for the serializer-only scenarios. Per-iteration
+setup (such as clearing the cache for uncached reads) is not timed. Run from the project directory:
+
+    python -m benchmarks.suite --items 100000 --output results.json --baseline benchmarks/baseline.json
+
+The database is seeded once per volume and reused by later runs (`--reseed` rebuilds it). With
+`--baseline`, each scenario's throughput and p95 latency are compared with the stored baseline. The
+command exits with status 1 when either is worse than the scenario's threshold, which is a fraction
+of the baseline value. `--save-baseline` writes the results as the new baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+SCENARIOS = {}
+DEFAULT_THRESHOLD = 0.25
+SERIALIZER_PAGE_SIZE = 100
+
+
+def scenario(name):
+    """
+    Registers a scenario. The decorated function takes the Bench and returns `(operation, prepare)`:
+    `operation()` is timed and returns a status, `prepare()` (or None) runs untimed before each call.
+    """
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+
+class Bench:
+    """
+    Shared state for scenarios: an authenticated client, the seeded ids and a seeded random generator.
+    """
+    def __init__(self, items, categories, seed_value=0):
+        from django.test import Client
+        from common.jwt_helpers import PermissionsAssigning
+        from benchmarks.seed import get_user
+
+        self.rng = random.Random(seed_value)
+        self.items = items
+        self.categories = categories
+        self.user = get_user()
+        token = PermissionsAssigning().get_token(self.user).access_token
+        self.client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.run_id = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+
+        from inventory.models import Item
+        self.item_ids = list(Item.objects.order_by('id').values_list('id', flat=True)[:items])
+
+    def random_item_id(self):
+        return self.rng.choice(self.item_ids)
+
+
+def clear_caches():
+    from django.core.cache import cache
+    from common.jwt_helpers import user_activity_cache
+    from common.local_cache import get_local_cache
+    cache.clear()
+    get_local_cache().clear()
+    user_activity_cache.clear()
+
+
+@scenario('item_get_cached')
+def item_get_cached(bench):
+    hot_ids = bench.rng.sample(bench.item_ids, min(1000, len(bench.item_ids)))
+    for pk in hot_ids:
+        bench.client.get(f'/inventory/item/{pk}/')
+    return lambda: bench.client.get(f'/inventory/item/{bench.rng.choice(hot_ids)}/').status_code, None
+
+
+@scenario('item_get_uncached')
+def item_get_uncached(bench):
+    return lambda: bench.client.get(f'/inventory/item/{bench.random_item_id()}/').status_code, clear_caches
+
+
+@scenario('category_list')
+def category_list(bench):
+    return lambda: bench.client.get('/inventory/categories/').status_code, None
+
+
+@scenario('category_search')
+def category_search(bench):
+    from benchmarks.seed import category_name
+
+    def operation():
+        term = category_name(bench.rng.randrange(bench.categories))[-4:]
+        return bench.client.get('/inventory/categories/search/', {'q': term}).status_code
+    return operation, None
+
+
+@scenario('item_create')
+def item_create(bench):
+    from inventory.models import Category
+    category_ids = list(Category.objects.values_list('id', flat=True)[:100])
+    counter = iter(range(sys.maxsize))
+
+    def operation():
+        n = next(counter)
+        data = {
+            'name': f"Bench {bench.run_id} {n}", 'sku': f"BENCH-{bench.run_id}-{n}", 'quantity': 5,
+            'price': '19.99', 'category_id': bench.rng.choice(category_ids),
+        }
+        return bench.client.post('/inventory/item/', data, content_type='application/json').status_code
+    return operation, None
+
+
+@scenario('item_update')
+def item_update(bench):
+    from inventory.models import Item
+
+    def operation():
+        pk = bench.random_item_id()
+        item = Item.objects.values('name', 'sku', 'price', 'category_id').get(id=pk)
+        data = {**item, 'price': str(item['price']), 'quantity': bench.rng.randint(0, 1000)}
+        return bench.client.put(f'/inventory/item/{pk}/', data, content_type='application/json').status_code
+    return operation, None
+
+
+@scenario('token_issue')
+def token_issue(bench):
+    from django.test import Client
+    from benchmarks.seed import USER_EMAIL, USER_PASSWORD
+    client = Client()
+    credentials = {'email': USER_EMAIL, 'password': USER_PASSWORD}
+    return lambda: client.post('/auth/users/login', credentials, content_type='application/json').status_code, None
+
+
+@scenario('serializer_item_drf')
+def serializer_item_drf(bench):
+    from rest_framework.renderers import JSONRenderer
+    from inventory.models import Item
+    from inventory.serializers import ItemSerializer
+    items = list(Item.objects.select_related('category', 'created_by', 'updated_by').order_by('id')[:SERIALIZER_PAGE_SIZE])
+    renderer = JSONRenderer()
+
+    def operation():
+        renderer.render(ItemSerializer(items, many=True).data)
+        return 'ok'
+    return operation, None
+
+
+@scenario('serializer_item_fast')
+def serializer_item_fast(bench):
+    from common.renderers import dumps
+    from inventory.fast_serializers import ItemFastSerializer
+    from inventory.models import Item
+    serializer = ItemFastSerializer()
+    rows = list(serializer.rows(Item.objects.order_by('id')[:SERIALIZER_PAGE_SIZE]))
+
+    def operation():
+        dumps([serializer.to_representation(row) for row in rows])
+        return 'ok'
+    return operation, None
+
+
+def measure(operation, prepare, duration, min_iterations=20):
+    """
+    Calls `operation` until `duration` seconds of timed work and `min_iterations` calls are reached.
+    """
+    from benchmarks.load import Stats
+    stats = Stats()
+    timed = 0.0
+    while timed < duration or len(stats.latencies) < min_iterations:
+        if prepare is not None:
+            prepare()
+        started = time.perf_counter()
+        result = operation()
+        latency = time.perf_counter() - started
+        timed += latency
+        stats.record(result, latency)
+    summary = stats.summary(timed)
+    summary['statuses'] = {str(status): count for status, count in summary['statuses'].items()}
+    return summary
+
+
+def prepare_database(args):
+    """
+    Migrates the benchmark database and seeds it, unless it already holds the requested volume.
+    """
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+    from benchmarks.seed import seed
+    from inventory.models import Category, Item
+
+    path = settings.DATABASES['default']['NAME']
+    if args.reseed and os.path.exists(path):
+        os.remove(path)
+    call_command('migrate', verbosity=0)
+    if Category.objects.count() == args.categories and Item.objects.count() == args.items:
+        return
+
+    connection.close()
+    os.remove(path)
+    call_command('migrate', verbosity=0)
+    print(f"Seeding {args.items} items across {args.categories} categories into {path}")
+    started = time.perf_counter()
+    seed(args.items, args.categories, batch_size=args.batch_size, stdout=sys.stdout)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def cleanup(bench):
+    """
+    Deletes the items created by the write scenarios so the database can be reused.
+    """
+    from inventory.models import Item
+    Item.objects.filter(sku__startswith=f"BENCH-{bench.run_id}-").delete()
+
+
+def compare(results, baseline, default_threshold=None):
+    """
+    Returns a list of regressions of `results` against `baseline`. A scenario regresses when its
+    throughput drops, or its p95 latency grows, by more than its threshold.
+    """
+    thresholds = baseline.get('thresholds', {})
+    default = default_threshold if default_threshold is not None else thresholds.get('default', DEFAULT_THRESHOLD)
+    regressions = []
+    for name, result in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        threshold = thresholds.get(name, default)
+        if result['rps'] < base['rps'] * (1 - threshold):
+            regressions.append(f"{name}: {result['rps']:.1f} ops/s vs baseline {base['rps']:.1f} (-{threshold:.0%} allowed)")
+        if base.get('p95_ms') and result['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} (+{threshold:.0%} allowed)")
+    return regressions
+
+
+def format_row(name, result, base=None):
+    change = f"{result['rps'] / base['rps'] - 1:+8.1%}" if base else f"{'-':>8}"
+    return (
+        f"{name:<24}{result['requests']:>9}{result['rps']:>11.1f}{change}"
+        f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--items', type=int, default=10000, help="number of seeded items, e.g. 10000, 100000 or 1000000")
+    parser.add_argument('--categories', type=int, help="number of seeded categories (default: items / 100)")
+    parser.add_argument('--batch-size', type=int, default=5000, help="rows per seeding batch")
+    parser.add_argument('--reseed', action='store_true', help="rebuild the benchmark database")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="run only these scenarios, repeatable")
+    parser.add_argument('--duration', type=float, default=3, help="timed seconds per scenario")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="compare with the results stored in this JSON file")
+    parser.add_argument('--threshold', type=float, help="allowed regression as a fraction, overriding the baseline's")
+    parser.add_argument('--save-baseline', action='store_true', help="write the results to --baseline instead of comparing")
+    args = parser.parse_args(argv)
+    args.categories = args.categories or max(1, args.items // 100)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+
+    prepare_database(args)
+    bench = Bench(args.items, args.categories)
+    baseline = {}
+    if args.baseline and not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('items') != args.items:
+            print(f"Warning: baseline was recorded with {baseline.get('items')} items, not {args.items}")
+
+    results = {
+        'recorded_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'items': args.items,
+        'categories': args.categories,
+        'duration': args.duration,
+        'scenarios': {},
+    }
+    print(f"{'scenario':<24}{'ops':>9}{'ops/s':>11}{'change':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    try:
+        for name in args.scenario or SCENARIOS:
+            clear_caches()
+            operation, prepare = SCENARIOS[name](bench)
+            results['scenarios'][name] = measure(operation, prepare, args.duration)
+            print(format_row(name, results['scenarios'][name], baseline.get('scenarios', {}).get(name)))
+    finally:
+        cleanup(bench)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline and args.save_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as baseline_file:
+                previous = json.load(baseline_file)
+        results['thresholds'] = previous.get('thresholds', {'default': args.threshold or DEFAULT_THRESHOLD})
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
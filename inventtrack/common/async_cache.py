@@ -0,0 +1,74 @@
+"""
+Async access to the default cache for native async views.
+
+With django-redis, values are read and written through a `redis.asyncio` client using the
+django-redis key format, serializer and compressor, so entries are shared with the sync cache and
+no request leaves the event loop. Other backends go through Django's async cache API.
+"""
+import asyncio
+import weakref
+from django.conf import settings
+from django.core.cache import cache
+
+
+class AsyncCache:
+    """
+    The subset of the cache API used by the read-through cache, as coroutines.
+    """
+    def __init__(self):
+        self.redis = None
+        options = settings.CACHES['default']
+        if options['BACKEND'].startswith('django_redis'):
+            import redis.asyncio
+            location = options['LOCATION']
+            if isinstance(location, (list, tuple)):
+                location = location[0]
+            self.redis = redis.asyncio.Redis.from_url(location)
+
+    @property
+    def client(self):
+        return cache.client
+
+    async def get(self, key):
+        if self.redis is None:
+            return await cache.aget(key)
+        value = await self.redis.get(self.client.make_key(key))
+        return None if value is None else self.client.decode(value)
+
+    async def get_many(self, keys):
+        if self.redis is None:
+            return await cache.aget_many(keys)
+        values = await self.redis.mget([self.client.make_key(key) for key in keys])
+        return {key: self.client.decode(value) for key, value in zip(keys, values) if value is not None}
+
+    async def set(self, key, value, timeout):
+        if self.redis is None:
+            return await cache.aset(key, value, timeout)
+        await self.redis.set(self.client.make_key(key), self.client.encode(value), px=int(timeout * 1000))
+
+    async def add(self, key, value, timeout):
+        if self.redis is None:
+            return await cache.aadd(key, value, timeout)
+        return bool(await self.redis.set(self.client.make_key(key), self.client.encode(value), px=int(timeout * 1000), nx=True))
+
+    async def delete(self, key):
+        if self.redis is None:
+            return await cache.adelete(key)
+        await self.redis.delete(self.client.make_key(key))
+
+    async def publish(self, channel, message):
+        await self.redis.publish(channel, message)
+
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_cache():
+    """
+    Returns the AsyncCache of the running event loop; Redis connections cannot be shared across loops.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncCache()
+    return client
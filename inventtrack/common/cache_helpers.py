@@ -0,0 +1,346 @@
+import asyncio
+import heapq
+import random
+import threading
+import time
+from operator import itemgetter
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from common.async_cache import get_async_cache
+from common.local_cache import get_invalidation_bus, get_local_cache, local_cache_setting
+from common.metrics import record_cache
+
+NOT_FOUND = '__not_found__'
+
+DEFAULTS = {
+    'SCHEMA_VERSION': 1,
+    'TIMEOUT': 60 * 60 * 24,
+    'TIMEOUT_JITTER': 0.1,
+    'NEGATIVE_TIMEOUT': 30,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2,
+    'LOCK_POLL_INTERVAL': 0.05,
+    'ACCESS_FLUSH_INTERVAL': 60,
+    'HOT_KEYS_MAX': 10000,
+}
+
+
+def cache_setting(name):
+    """
+    Returns a read-through cache setting from `settings.READ_THROUGH_CACHE`, falling back to DEFAULTS.
+    """
+    return getattr(settings, 'READ_THROUGH_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class AccessCounter:
+    """
+    Counts reads per identifier in the worker process and, every `ACCESS_FLUSH_INTERVAL` seconds,
+    merges them into a shared `{identifier: score}` map in the cache. Previous scores are halved on
+    every merge, so the ranking follows recent traffic, and only the `HOT_KEYS_MAX` best are kept.
+
+    Workers merge with a read-modify-write, so concurrent flushes can lose counts. The map only
+    orders cache warm-up, it is not an exact statistic.
+    """
+    def __init__(self, key):
+        self.key = key
+        self.counts = {}
+        self.flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, identifier):
+        """
+        Counts one read and returns the pending counts when they are due to be merged, else None.
+        """
+        with self._lock:
+            self.counts[identifier] = self.counts.get(identifier, 0) + 1
+            if time.monotonic() - self.flushed_at < cache_setting('ACCESS_FLUSH_INTERVAL'):
+                return None
+            counts, self.counts, self.flushed_at = self.counts, {}, time.monotonic()
+        return counts
+
+    def merge(self, counts):
+        scores = {identifier: score / 2 for identifier, score in (cache.get(self.key) or {}).items()}
+        for identifier, count in counts.items():
+            scores[identifier] = scores.get(identifier, 0) + count
+        cache.set(self.key, dict(heapq.nlargest(cache_setting('HOT_KEYS_MAX'), scores.items(), key=itemgetter(1))), None)
+
+    def hottest(self, limit=None):
+        """
+        Returns the identifiers with the highest scores, best first.
+        """
+        ranked = sorted((cache.get(self.key) or {}).items(), key=itemgetter(1), reverse=True)
+        return [identifier for identifier, _ in ranked[:limit]]
+
+
+class ReadThroughCache:
+    """
+    A read-through cache over the default Django cache for one namespace of entities.
+
+    Keys carry a schema version (`v1:item:42`) so a change in the cached representation is rolled
+    out by bumping `SCHEMA_VERSION` instead of flushing. Timeouts are jittered so entries written
+    together do not expire together, misses are loaded by a single caller per key while the others
+    wait for its result, and "not found" results are cached briefly so missing ids cannot be used
+    to hammer the database.
+
+    With `local=True` (the default when `LOCAL_CACHE['ENABLED']`), reads are served first from a
+    per-process LRU in front of the shared cache. Every write publishes the touched keys on the
+    invalidation bus so all workers drop their local copies.
+
+    The `a`-prefixed methods are the async equivalents used by native async views; they talk to
+    the shared cache through `common.async_cache` and take async loaders.
+
+    Lookups are reported to the current request's metrics as hits (including cached misses) and misses.
+    With `track_access=True`, single-entry reads are also counted in an AccessCounter, whose
+    `hottest()` identifiers are warmed first after a restart.
+    """
+    def __init__(self, namespace, timeout=None, version=None, local=None, track_access=False):
+        self.namespace = namespace
+        self.timeout = timeout or cache_setting('TIMEOUT')
+        self.version = version or cache_setting('SCHEMA_VERSION')
+        self.local = local_cache_setting('ENABLED') if local is None else local
+        self.access = AccessCounter(self.key('hot')) if track_access else None
+
+    def hottest(self, limit=None):
+        """
+        Returns the most read identifiers, best first; empty unless access is tracked.
+        """
+        return self.access.hottest(limit) if self.access is not None else []
+
+    def key(self, identifier):
+        return f"v{self.version}:{self.namespace}:{identifier}"
+
+    def jittered_timeout(self, timeout=None):
+        """
+        Spreads the timeout uniformly by +/- TIMEOUT_JITTER of its value.
+        """
+        timeout = timeout or self.timeout
+        jitter = cache_setting('TIMEOUT_JITTER')
+        return int(timeout * random.uniform(1 - jitter, 1 + jitter))
+
+    def get(self, identifier):
+        """
+        Returns the cached value, NOT_FOUND for a cached miss, or None when nothing is cached.
+        """
+        started = time.perf_counter()
+        value = self.lookup(self.key(identifier))
+        hit = value is not None
+        record_cache(int(hit), int(not hit), time.perf_counter() - started)
+        if self.access is not None:
+            counts = self.access.record(identifier)
+            if counts:
+                self.access.merge(counts)
+        return value
+
+    def lookup(self, key):
+        if not self.local:
+            return cache.get(key)
+
+        local_cache = get_local_cache()
+        value = local_cache.get(key)
+        if value is not None:
+            return value
+        epoch = local_cache.epoch
+        value = cache.get(key)
+        if value is not None and value != NOT_FOUND:
+            local_cache.set(key, value, epoch)
+        return value
+
+    def get_many(self, identifiers, include_missing=False):
+        """
+        Returns `{identifier: value}` for the identifiers present in the cache. Cached misses are
+        skipped, or returned as NOT_FOUND with `include_missing`.
+        """
+        started = time.perf_counter()
+        keys = {self.key(identifier): identifier for identifier in identifiers}
+        found = {}
+        lookups = len(keys)
+        if self.local:
+            local_cache = get_local_cache()
+            for key in list(keys):
+                value = local_cache.get(key)
+                if value is not None:
+                    found[keys.pop(key)] = value
+            epoch = local_cache.epoch
+
+        shared = cache.get_many(list(keys))
+        for key, value in shared.items():
+            if value == NOT_FOUND:
+                if include_missing:
+                    found[keys[key]] = value
+                continue
+            found[keys[key]] = value
+            if self.local:
+                local_cache.set(key, value, epoch)
+        misses = len(keys) - len(shared)
+        record_cache(lookups - misses, misses, time.perf_counter() - started)
+        return found
+
+    def set(self, identifier, value):
+        key = self.key(identifier)
+        cache.set(key, value, self.jittered_timeout())
+        self.invalidate_local([key])
+
+    def set_many(self, values):
+        """
+        Writes many entries in one round trip. They share one jittered timeout; batches written at
+        different times still spread out.
+        """
+        if values:
+            entries = {self.key(identifier): value for identifier, value in values.items()}
+            cache.set_many(entries, self.jittered_timeout())
+            self.invalidate_local(list(entries))
+
+    def set_missing(self, identifiers):
+        """
+        Caches a short-lived NOT_FOUND marker for each identifier, like `get_or_load` does for a
+        single miss.
+        """
+        if identifiers:
+            cache.set_many({self.key(identifier): NOT_FOUND for identifier in identifiers}, cache_setting('NEGATIVE_TIMEOUT'))
+
+    def add_many(self, values):
+        """
+        Writes only the entries that are not cached yet, never replacing one a writer stored, and
+        returns how many were added. With django-redis the `SET NX` commands go out in one pipeline;
+        other backends add entry by entry.
+        """
+        if not values:
+            return 0
+        timeout = self.jittered_timeout()
+        if not settings.CACHES['default']['BACKEND'].startswith('django_redis'):
+            return sum(1 for identifier, value in values.items() if cache.add(self.key(identifier), value, timeout))
+
+        from django_redis import get_redis_connection
+        pipeline = get_redis_connection('default').pipeline(transaction=False)
+        for identifier, value in values.items():
+            pipeline.set(cache.client.make_key(self.key(identifier)), cache.client.encode(value), ex=timeout, nx=True)
+        return sum(1 for added in pipeline.execute() if added)
+
+    def delete(self, identifier):
+        key = self.key(identifier)
+        cache.delete(key)
+        self.invalidate_local([key])
+
+    def delete_many(self, identifiers):
+        if identifiers:
+            keys = [self.key(identifier) for identifier in identifiers]
+            cache.delete_many(keys)
+            self.invalidate_local(keys)
+
+    def invalidate_local(self, keys):
+        """
+        Drops `keys` from this process's local cache and tells every other worker to do the same.
+        """
+        if self.local:
+            get_local_cache().invalidate(keys)
+            get_invalidation_bus().publish(keys)
+
+    def get_or_load(self, identifier, loader):
+        """
+        Returns the cached value for `identifier`, calling `loader()` on a miss. `loader` returns the
+        value to cache, or None when the entity does not exist (which is cached as a short-lived miss).
+        Only the caller holding the per-key lock runs the loader; concurrent callers poll for its result.
+        """
+        value = self.get(identifier)
+        if value == NOT_FOUND:
+            return None
+        if value is not None:
+            return value
+
+        lock_key = f"{self.key(identifier)}:lock"
+        if cache.add(lock_key, 1, cache_setting('LOCK_TIMEOUT')):
+            try:
+                return self.load(identifier, loader)
+            finally:
+                cache.delete(lock_key)
+
+        deadline = time.monotonic() + cache_setting('LOCK_WAIT')
+        while time.monotonic() < deadline:
+            time.sleep(cache_setting('LOCK_POLL_INTERVAL'))
+            value = self.get(identifier)
+            if value == NOT_FOUND:
+                return None
+            if value is not None:
+                return value
+        return loader()
+
+    def load(self, identifier, loader):
+        """
+        Calls the loader and caches its result, or a short-lived NOT_FOUND marker when it returns None.
+        """
+        value = loader()
+        if value is None:
+            cache.set(self.key(identifier), NOT_FOUND, cache_setting('NEGATIVE_TIMEOUT'))
+        else:
+            self.set(identifier, value)
+        return value
+
+    async def aget(self, identifier):
+        started = time.perf_counter()
+        value = await self.alookup(self.key(identifier))
+        hit = value is not None
+        record_cache(int(hit), int(not hit), time.perf_counter() - started)
+        if self.access is not None:
+            counts = self.access.record(identifier)
+            if counts:
+                await sync_to_async(self.access.merge)(counts)
+        return value
+
+    async def alookup(self, key):
+        client = get_async_cache()
+        if not self.local:
+            return await client.get(key)
+
+        local_cache = get_local_cache()
+        value = local_cache.get(key)
+        if value is not None:
+            return value
+        epoch = local_cache.epoch
+        value = await client.get(key)
+        if value is not None and value != NOT_FOUND:
+            local_cache.set(key, value, epoch)
+        return value
+
+    async def aset(self, identifier, value):
+        key = self.key(identifier)
+        await get_async_cache().set(key, value, self.jittered_timeout())
+        if self.local:
+            get_local_cache().invalidate([key])
+            await get_invalidation_bus().apublish([key])
+
+    async def aget_or_load(self, identifier, loader):
+        """
+        Async variant of `get_or_load`; `loader` is a coroutine function.
+        """
+        value = await self.aget(identifier)
+        if value == NOT_FOUND:
+            return None
+        if value is not None:
+            return value
+
+        client = get_async_cache()
+        lock_key = f"{self.key(identifier)}:lock"
+        if await client.add(lock_key, 1, cache_setting('LOCK_TIMEOUT')):
+            try:
+                return await self.aload(identifier, loader)
+            finally:
+                await client.delete(lock_key)
+
+        deadline = time.monotonic() + cache_setting('LOCK_WAIT')
+        while time.monotonic() < deadline:
+            await asyncio.sleep(cache_setting('LOCK_POLL_INTERVAL'))
+            value = await self.aget(identifier)
+            if value == NOT_FOUND:
+                return None
+            if value is not None:
+                return value
+        return await loader()
+
+    async def aload(self, identifier, loader):
+        value = await loader()
+        if value is None:
+            await get_async_cache().set(self.key(identifier), NOT_FOUND, cache_setting('NEGATIVE_TIMEOUT'))
+        else:
+            await self.aset(identifier, value)
+        return value
@@ -0,0 +1,69 @@
+"""
+Helpers for conditional GET (ETag / If-None-Match and Last-Modified / If-Modified-Since).
+
+ETags are strong and derived from row versions (`id`, `updated_at`) rather than from response
+bodies, so freshness can be decided from an index-only query before anything is serialized.
+"""
+import hashlib
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+
+def make_etag(*parts):
+    """
+    Returns a quoted strong ETag derived from the given version parts.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def gzip_etag(etag):
+    """
+    Returns the ETag of the gzip-encoded representation of a resource.
+    """
+    return etag[:-1] + '-gzip"'
+
+
+def rows_etag(rows, *extra):
+    """
+    Returns `(etag, last_modified)` for a page of rows from their ids and update timestamps.
+    """
+    versions = [(row.id, row.updated_at.isoformat()) for row in rows]
+    last_modified = max((row.updated_at for row in rows), default=None)
+    return make_etag(versions, *extra), last_modified
+
+
+def is_not_modified(request, etag=None, last_modified=None):
+    """
+    Evaluates If-None-Match (which takes precedence) or If-Modified-Since against the current
+    version of a resource. Either the identity or gzip ETag of the resource is accepted.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        if etag is None:
+            return False
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or gzip_etag(etag) in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE'))
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """
+    Adds ETag and Last-Modified headers to a response (keeping an ETag it already carries).
+    """
+    if etag is not None and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified(etag=None, last_modified=None):
+    """
+    Returns an empty 304 response carrying the current validators.
+    """
+    return set_validators(HttpResponseNotModified(), etag, last_modified)
@@ -0,0 +1,196 @@
+"""
+Primary/replica database routing.
+
+Reads are sent to a random healthy replica from `DATABASE_REPLICATION['REPLICAS']` and writes to
+`default`. A replica is skipped while its measured replication lag exceeds `MAX_LAG_SECONDS` or
+it cannot be reached; with no healthy replica, reads fall back to the primary.
+
+Reads are pinned to the primary:
+- for the whole of an unsafe (writing) request, so reads inside it see its own writes
+- for `STICKY_SECONDS` after a successful write, signalled back by the client through the cookie
+  or header set on the write's response (read-your-writes)
+- inside `use_primary()`, e.g. for loaders filling the long-lived item cache
+"""
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from common.log_utils import LoggerUtility
+
+logger_utility = LoggerUtility()
+
+DEFAULTS = {
+    'REPLICAS': [],
+    'STICKY_SECONDS': 5,
+    'MAX_LAG_SECONDS': 5,
+    'LAG_CHECK_INTERVAL': 2,
+    'COOKIE_NAME': 'read_primary_until',
+    'HEADER_NAME': 'X-Read-Primary-Until',
+}
+
+# Zero when the replica has replayed everything it received, otherwise the age of the last replayed transaction.
+POSTGRES_LAG_SQL = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END
+"""
+
+_pinned = contextvars.ContextVar('db_pinned_to_primary', default=False)
+
+
+def replication_setting(name):
+    """
+    Returns a replication setting from `settings.DATABASE_REPLICATION`, falling back to DEFAULTS.
+    """
+    return getattr(settings, 'DATABASE_REPLICATION', {}).get(name, DEFAULTS[name])
+
+
+@contextmanager
+def use_primary():
+    """
+    Sends every read in the block (including ones run through `sync_to_async`) to the primary.
+    """
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def measure_lag(alias):
+    """
+    Returns the replication lag of `alias` in seconds. Backends without replication report 0.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_SQL)
+        lag = cursor.fetchone()[0]
+    return float(lag or 0)
+
+
+class ReplicaLagMonitor:
+    """
+    Remembers each replica's lag, re-measuring it at most every `LAG_CHECK_INTERVAL` seconds per
+    process. Only one thread measures a replica at a time; the others use the last known value.
+    An unreachable replica counts as infinitely lagging until its next check.
+    """
+    def __init__(self):
+        self._lags = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def lag(self, alias):
+        measured = self._lags.get(alias)
+        if measured is not None and time.monotonic() - measured[0] < replication_setting('LAG_CHECK_INTERVAL'):
+            return measured[1]
+
+        with self._guard:
+            lock = self._locks.setdefault(alias, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return measured[1] if measured is not None else float('inf')
+        try:
+            try:
+                lag = measure_lag(alias)
+            except DatabaseError as e:
+                logger_utility.log_error(f"Replication lag check failed for {alias}: {e}")
+                lag = float('inf')
+            self._lags[alias] = (time.monotonic(), lag)
+            return lag
+        finally:
+            lock.release()
+
+    def reset(self):
+        self._lags.clear()
+
+
+lag_monitor = ReplicaLagMonitor()
+
+
+class PrimaryReplicaRouter:
+    """
+    Routes reads to healthy replicas and writes to the primary.
+    """
+    def db_for_read(self, model, **hints):
+        replicas = replication_setting('REPLICAS')
+        if not replicas or _pinned.get():
+            return DEFAULT_DB_ALIAS
+        max_lag = replication_setting('MAX_LAG_SECONDS')
+        healthy = [alias for alias in replicas if lag_monitor.lag(alias) <= max_lag]
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replication_setting('REPLICAS')}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pins reads to the primary for unsafe requests and for requests made shortly after a write by
+    the same client. Successful writes answer with a cookie and a header holding the time until
+    which the client's reads stay on the primary; API clients that do not keep cookies echo the
+    header. Values further in the future than `STICKY_SECONDS` are ignored.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not replication_setting('REPLICAS'):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if self.needs_primary(request):
+            with use_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        if self.needs_primary(request):
+            with use_primary():
+                response = await self.get_response(request)
+        else:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def needs_primary(self, request):
+        return request.method not in self.safe_methods or self.recently_wrote(request)
+
+    def recently_wrote(self, request):
+        header = 'HTTP_' + replication_setting('HEADER_NAME').upper().replace('-', '_')
+        value = request.META.get(header) or request.COOKIES.get(replication_setting('COOKIE_NAME'))
+        if not value:
+            return False
+        try:
+            until = float(value)
+        except ValueError:
+            return False
+        now = time.time()
+        # One second of slack for the rounding of the stamp and clock skew between servers.
+        return now < until <= now + replication_setting('STICKY_SECONDS') + 1
+
+    def process_response(self, request, response):
+        if request.method not in self.safe_methods and response.status_code < 400:
+            sticky_seconds = replication_setting('STICKY_SECONDS')
+            until = f"{time.time() + sticky_seconds:.3f}"
+            response.set_cookie(replication_setting('COOKIE_NAME'), until, max_age=sticky_seconds, httponly=True, samesite='Lax')
+            response[replication_setting('HEADER_NAME')] = until
+        return response
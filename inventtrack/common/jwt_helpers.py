@@ -1,8 +1,14 @@
 from rest_framework_simplejwt.tokens import RefreshToken
-from functools import wraps
-from rest_framework.response import Response
-from rest_framework import status
+from asgiref.sync import sync_to_async
+from collections import OrderedDict
+import hmac
+import threading
+import time
+from django.conf import settings
+from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
 
 class PermissionsAssigning:
     """
@@ -29,25 +35,192 @@ class PermissionsAssigning:
         return common_permissions
 
 
-def check_permissions(required_permissions):
+class TokenClaimsCache:
     """
-    Custom decorator to check if the user has the required permissions for class-based views.
+    A small thread-safe LRU of validated access tokens keyed by their signature. Entries expire
+    at the token's own `exp` claim, so a cached token is never honoured past its lifetime.
     """
-    def decorator(view_func):
-        @wraps(view_func)
-        def _wrapped_view(self, *args, **kwargs):
-            request = self.request
-            jwt_authenticator = JWTAuthentication()
-            try:
-                user, token = jwt_authenticator.authenticate(request)
-            except Exception as e:
-                return Response({"message": "Authentication failed.", "detail": str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+    def __init__(self, max_size=None):
+        self.max_size = max_size or getattr(settings, 'JWT_CLAIMS_CACHE_SIZE', 10000)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
 
-            user_permissions = token.get('permissions', [])
-            if not all(perm in user_permissions for perm in required_permissions):
-                return Response({"message": "Permission denied. You do not have the required permissions."}, 
-                                status=status.HTTP_403_FORBIDDEN)
+    def get(self, raw_token):
+        """
+        Returns the validated token cached for `raw_token`, or None if absent or expired.
+        """
+        signature = raw_token.rsplit(b'.', 1)[-1]
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                return None
+            cached_raw_token, token, expires_at = entry
+            if expires_at <= time.time() or not hmac.compare_digest(cached_raw_token, raw_token):
+                del self._entries[signature]
+                return None
+            self._entries.move_to_end(signature)
+            return token
+
+    def set(self, raw_token, token):
+        """
+        Caches a validated token until its `exp` claim, evicting the least recently used entry when full.
+        """
+        expires_at = token.get('exp')
+        if expires_at is None:
+            return
+        signature = raw_token.rsplit(b'.', 1)[-1]
+        with self._lock:
+            self._entries[signature] = (raw_token, token, expires_at)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_claims_cache = TokenClaimsCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips signature verification and claim decoding for tokens it has
+    already validated, using the process-wide `token_claims_cache`.
+    """
+    def get_validated_token(self, raw_token):
+        """
+        Returns the cached validated token for `raw_token`, validating and caching it on a miss.
+        """
+        token = token_claims_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_claims_cache.set(raw_token, token)
+        return token
+
+
+class UserActivityCache:
+    """
+    A short-TTL, per-process LRU of `User.is_active` flags used to honour deactivation for
+    stateless requests without querying the user table on every request.
+    """
+    def __init__(self, ttl=None, max_size=None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'JWT_USER_ACTIVE_CHECK_TTL', 60)
+        self.max_size = max_size or getattr(settings, 'JWT_CLAIMS_CACHE_SIZE', 10000)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_active(self, user_id):
+        """
+        Returns whether the user exists and is active, reading the database at most once per TTL.
+        """
+        is_active = self.get(user_id)
+        if is_active is None:
+            from authentication.models import User
+            is_active = self.set(user_id, User.objects.filter(id=user_id, is_active=True).exists())
+        return is_active
+
+    async def ais_active(self, user_id):
+        """
+        Async variant of `is_active`, using the async ORM on a miss.
+        """
+        is_active = self.get(user_id)
+        if is_active is None:
+            from authentication.models import User
+            is_active = self.set(user_id, await User.objects.filter(id=user_id, is_active=True).aexists())
+        return is_active
+
+    def get(self, user_id):
+        """
+        Returns the cached flag for `user_id`, or None when absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[0]
+
+    def set(self, user_id, is_active):
+        with self._lock:
+            self._entries[user_id] = (is_active, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return is_active
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_activity_cache = UserActivityCache()
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication that resolves safe (read-only) requests to a `TokenUser` built from the
+    token claims (`user_id`, `email`, `permissions`) instead of loading the `User` row. Unsafe
+    requests still load the real user, since writes record it on `created_by`/`updated_by`.
+    When `JWT_USER_ACTIVE_CHECK_TTL` is positive, deactivated users are rejected within that many
+    seconds through `user_activity_cache`.
+    """
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_token_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        """
+        Builds the lightweight user for a validated token, checking revocation when enabled.
+        """
+        user = TokenUser(validated_token)
+        if user_activity_cache.ttl > 0 and not user_activity_cache.is_active(user.id):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async variant of `authenticate` for native async views, taking a plain Django request.
+        Safe requests never leave the event loop on a warm activity cache; unsafe requests load
+        the user in a worker thread.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if request.method not in SAFE_METHODS:
+            return await sync_to_async(self.get_user)(validated_token), validated_token
+
+        user = TokenUser(validated_token)
+        if user_activity_cache.ttl > 0 and not await user_activity_cache.ais_active(user.id):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user, validated_token
+
+
+class HasTokenPermissions(BasePermission):
+    """
+    Grants access when the permissions claim of the already-authenticated token (`request.auth`)
+    contains every permission the view requires for the request method. Views declare them as
+    `required_permissions = {'GET': [...], 'POST': [...]}`.
+    """
+    message = "Permission denied. You do not have the required permissions."
 
-            return view_func(self, *args, **kwargs)
-        return _wrapped_view
-    return decorator
+    def has_permission(self, request, view):
+        method = 'GET' if request.method == 'HEAD' else request.method
+        required_permissions = getattr(view, 'required_permissions', {}).get(method, [])
+        if request.auth is None:
+            return not required_permissions
+        user_permissions = request.auth.get('permissions', [])
+        return all(perm in user_permissions for perm in required_permissions)
@@ -0,0 +1,219 @@
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from common.log_utils import LoggerUtility
+
+logger_utility = LoggerUtility()
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'TIMEOUT': 30,
+    'INVALIDATION_BUS': None,
+    'CHANNEL': 'inventtrack:cache-invalidation',
+}
+
+
+def local_cache_setting(name):
+    """
+    Returns an in-process cache setting from `settings.LOCAL_CACHE`, falling back to DEFAULTS.
+    """
+    return getattr(settings, 'LOCAL_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class LocalLRUCache:
+    """
+    A thread-safe, size-aware LRU cache living in the worker process, bounded by the total size
+    of the stored values. Entries also carry a short TTL as a safety net for missed invalidations.
+
+    Every invalidation bumps `epoch`. Readers capture the epoch before fetching from the shared
+    cache and pass it to `set`, which refuses the write if an invalidation happened in between, so
+    a value read just before an invalidation cannot be resurrected locally.
+    """
+    def __init__(self, max_bytes=None, timeout=None):
+        self.max_bytes = max_bytes or local_cache_setting('MAX_BYTES')
+        self.timeout = timeout or local_cache_setting('TIMEOUT')
+        self.epoch = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def size_of(cls, value):
+        if value is None:
+            return 0
+        if isinstance(value, (bytes, str)):
+            return len(value)
+        if isinstance(value, tuple):
+            return sum(cls.size_of(part) for part in value)
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, epoch):
+        """
+        Stores `value` unless the cache was invalidated since `epoch` or the value alone exceeds the budget.
+        """
+        size = self.size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if epoch != self.epoch:
+                return
+            self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.timeout)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, keys):
+        with self._lock:
+            self.epoch += 1
+            for key in keys:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
+class LocalInvalidationBus:
+    """
+    In-process stand-in for the Redis invalidation channel, used with non-Redis caches and in tests.
+    """
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def publish(self, keys):
+        for callback in self.subscribers:
+            callback(keys)
+
+    async def apublish(self, keys):
+        self.publish(keys)
+
+
+class RedisInvalidationBus:
+    """
+    Broadcasts invalidated keys to every worker over a Redis pub/sub channel. A daemon thread per
+    process listens on the channel; after a connection error it reconnects and clears the local
+    caches, since messages sent while disconnected are lost.
+    """
+    def __init__(self, channel=None):
+        self.channel = channel or local_cache_setting('CHANNEL')
+        self.subscribers = []
+        self._listener_pid = None
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        self.ensure_listener()
+
+    def publish(self, keys):
+        try:
+            self.get_connection().publish(self.channel, json.dumps(list(keys)))
+        except Exception as e:
+            logger_utility.log_error(f"Failed to publish cache invalidation: {str(e)}")
+        # The local process may not have started its listener yet (e.g. right after a fork).
+        self.ensure_listener()
+
+    async def apublish(self, keys):
+        from common.async_cache import get_async_cache
+        try:
+            await get_async_cache().publish(self.channel, json.dumps(list(keys)))
+        except Exception as e:
+            logger_utility.log_error(f"Failed to publish cache invalidation: {str(e)}")
+        self.ensure_listener()
+
+    def ensure_listener(self):
+        """
+        Starts the listener thread once per process, including in children forked after startup.
+        """
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(target=self.listen, name='cache-invalidation-listener', daemon=True).start()
+
+    def listen(self):
+        while True:
+            try:
+                pubsub = self.get_connection().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    keys = json.loads(message['data'])
+                    for callback in self.subscribers:
+                        callback(keys)
+            except Exception as e:
+                logger_utility.log_error(f"Cache invalidation listener disconnected: {str(e)}")
+                for callback in self.subscribers:
+                    callback(None)
+                time.sleep(1)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_invalidation_bus():
+    """
+    Returns the process-wide invalidation bus. Defaults to Redis pub/sub when the default cache is
+    django-redis and to the in-process bus otherwise; `LOCAL_CACHE['INVALIDATION_BUS']` overrides it.
+    """
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            kind = local_cache_setting('INVALIDATION_BUS')
+            if kind is None:
+                backend = settings.CACHES['default']['BACKEND']
+                kind = 'redis' if backend.startswith('django_redis') else 'local'
+            _bus = RedisInvalidationBus() if kind == 'redis' else LocalInvalidationBus()
+        return _bus
+
+
+_local_cache = None
+
+
+def get_local_cache():
+    """
+    Returns the process-wide LocalLRUCache, subscribed to the invalidation bus on first use.
+    """
+    global _local_cache
+    with _bus_lock:
+        local_cache = _local_cache
+    if local_cache is None:
+        local_cache = LocalLRUCache()
+        bus = get_invalidation_bus()
+        with _bus_lock:
+            if _local_cache is not None:
+                return _local_cache
+            _local_cache = local_cache
+        bus.subscribe(lambda keys: local_cache.clear() if keys is None else local_cache.invalidate(keys))
+    return local_cache
@@ -1,4 +1,41 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import weakref
+from datetime import datetime, timezone
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def log_setting(name, default):
+    return getattr(settings, name, default) if settings.configured else default
+
+
+class LazyPayload:
+    """
+    Wraps a request or response body so it is only rendered, and truncated to `max_chars`, when a
+    handler formats the record on the logging thread, never on the request path.
+    """
+    __slots__ = ('payload', 'max_chars')
+
+    def __init__(self, payload, max_chars):
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self):
+        try:
+            text = json.dumps(self.payload, default=str, ensure_ascii=False)
+        except (TypeError, ValueError):
+            text = repr(self.payload)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... ({len(text)} chars)"
+        return text
+
 
 class LoggerUtility:
     """
@@ -7,23 +44,134 @@ class LoggerUtility:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
+    def sample_body(self):
+        """
+        Returns whether this request's body should be logged, per `LOG_BODY_SAMPLE_RATE`.
+        """
+        rate = log_setting('LOG_BODY_SAMPLE_RATE', 1.0)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
     def log_request(self, request, message):
         """
-        Logs the incoming request details, including user information if authenticated.
+        Logs the incoming request details, including user information if authenticated. The body
+        is attached lazily, for a sample of requests only.
         """
-        user_info = (
-            f"User: {request.user.id} - {request.user.email}" if request.user.is_authenticated else "User: Anonymous"
-        )
-        self.logger.info(f"{message} | Method: {request.method} | Path: {request.path} | User: {user_info} | Data: {request.data}")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        user = getattr(request, 'user', None)
+        authenticated = user is not None and user.is_authenticated
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'user_id': user.id if authenticated else None,
+            'user_email': getattr(user, 'email', None) if authenticated else None,
+        }
+        if self.sample_body():
+            fields['data'] = LazyPayload(getattr(request, 'data', None), log_setting('LOG_BODY_MAX_CHARS', 2048))
+        self.logger.info(message, extra={'http': fields})
 
     def log_response(self, response, message):
         """
-        Logs the outgoing response details.
+        Logs the outgoing response details. Error bodies are always attached, others are sampled.
         """
-        self.logger.info(f"{message} | Status Code: {response.status_code} | Data: {response.data}")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        fields = {'status_code': response.status_code}
+        if response.status_code >= 400 or self.sample_body():
+            fields['data'] = LazyPayload(response.data, log_setting('LOG_BODY_MAX_CHARS', 2048))
+        self.logger.info(message, extra={'http': fields})
 
     def log_error(self, error_message):
         """
         Logs error messages.
         """
         self.logger.error(error_message)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects, including the structured `http` fields attached
+    by LoggerUtility.
+    """
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        http = getattr(record, 'http', None)
+        if http:
+            entry['http'] = {key: str(value) if isinstance(value, LazyPayload) else value for key, value in http.items()}
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts records on a bounded in-memory queue drained by a QueueListener thread, which formats
+    them and writes them to the `targets` handlers. Logging calls on the request path only pay for
+    an enqueue; when the queue is full, records are dropped rather than blocking. Dropped records
+    are counted in `dropped` and exported as `inventtrack_log_records_dropped_total`.
+
+    `targets` are handler configs (`{'class': ..., 'level': ..., **kwargs}`), all formatted with
+    JsonFormatter. The listener is restarted in processes forked after configuration.
+    """
+    instances = weakref.WeakSet()
+
+    def __init__(self, targets, queue_size=10000):
+        self.queue_size = queue_size
+        super().__init__(queue.Queue(queue_size))
+        self.targets = [self.build_target(dict(target)) for target in targets]
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.start()
+        atexit.register(self.stop)
+        self.instances.add(self)
+
+    @staticmethod
+    def build_target(config):
+        handler_class = import_string(config.pop('class'))
+        level = config.pop('level', logging.NOTSET)
+        handler = handler_class(**config)
+        handler.setLevel(level)
+        handler.setFormatter(JsonFormatter())
+        return handler
+
+    def start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked child: the parent's listener thread does not exist here and its queue may hold stale records.
+                self.queue = queue.Queue(self.queue_size)
+            self._listener = logging.handlers.QueueListener(self.queue, *self.targets, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+
+    def prepare(self, record):
+        # Unlike the stdlib QueueHandler, leave formatting (and the message arguments) to the listener thread.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self.start()
+        super().emit(record)
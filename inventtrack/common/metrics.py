@@ -0,0 +1,365 @@
+"""
+Per-endpoint request instrumentation and a Prometheus text-format `/metrics` view.
+
+MetricsMiddleware opens a RequestMetrics in a context variable for each request. Code running
+on behalf of the request adds to it:
+- database queries, through an execute wrapper installed on every connection
+- the read-through cache, through `record_cache`
+- serializers, through `timer('serializer')` or TimedSerializerMixin
+
+Context variables follow the request into `sync_to_async` worker threads, so async views are
+covered too. When the response is ready the totals are observed into histograms labelled by URL
+name. They can optionally be returned in a `Server-Timing` header.
+
+Database connection pool statistics, and the log records dropped by BackgroundQueueHandler, are read
+at scrape time.
+
+The registry lives in the worker process; scrape each worker or aggregate upstream.
+"""
+import contextvars
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from common.log_utils import BackgroundQueueHandler
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Totals collected while serving one request.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_seconds = 0.0
+        self.timings = {}
+        self._depth = {}
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def add_cache(self, hits, misses, seconds):
+        with self._lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+            self.cache_seconds += seconds
+
+    @contextmanager
+    def timer(self, name):
+        # Only the outermost of nested timers with the same name counts (e.g. nested serializers).
+        depth = self._depth.get(name, 0)
+        self._depth[name] = depth + 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[name] = depth
+            if depth == 0:
+                with self._lock:
+                    self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def current_metrics():
+    return _current.get()
+
+
+def record_cache(hits, misses, seconds):
+    """
+    Adds cache lookups to the current request's totals, if any.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_cache(hits, misses, seconds)
+
+
+@contextmanager
+def timer(name):
+    """
+    Times a block into the current request's `name` timing; a no-op outside a request.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.timer(name):
+        yield
+
+
+class TimedSerializerMixin:
+    """
+    Counts a DRF serializer's `to_representation` as serializer time; nested and per-item calls of
+    a `many=True` list are only counted once.
+    """
+    def to_representation(self, instance):
+        with timer('serializer'):
+            return super().to_representation(instance)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(time.perf_counter() - started)
+
+
+def install_query_wrapper(connection, **kwargs):
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{format_labels(self.labels, labels)} {value}"
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = entry[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._values.items()}
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket = format_labels(self.labels, labels, ['le="%s"' % bound])
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            bucket = format_labels(self.labels, labels, ['le="+Inf"'])
+            yield f"{self.name}_bucket{bucket} {count}"
+            yield f"{self.name}_sum{format_labels(self.labels, labels)} {total}"
+            yield f"{self.name}_count{format_labels(self.labels, labels)} {count}"
+
+
+class CallbackMetric:
+    """
+    A gauge or counter whose `(label values, value)` samples are read from `callback()` at scrape time.
+    """
+    def __init__(self, name, documentation, kind, callback, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.callback = callback
+        self.labels = tuple(labels)
+
+    def samples(self):
+        for labels, value in self.callback():
+            yield f"{self.name}{format_labels(self.labels, labels)} {value}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+REQUESTS = REGISTRY.register(Counter(
+    'inventtrack_requests_total', 'Requests served.', ['view', 'method', 'status']))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'inventtrack_request_duration_seconds', 'Wall time spent serving a request.', ['view', 'method']))
+DB_QUERIES = REGISTRY.register(Histogram(
+    'inventtrack_request_db_queries', 'SQL queries executed per request.', ['view', 'method'], COUNT_BUCKETS))
+DB_SECONDS = REGISTRY.register(Histogram(
+    'inventtrack_request_db_duration_seconds', 'Time spent executing SQL per request.', ['view', 'method']))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'inventtrack_cache_lookups_total', 'Read-through cache lookups by result.', ['view', 'result']))
+CACHE_SECONDS = REGISTRY.register(Histogram(
+    'inventtrack_request_cache_duration_seconds', 'Time spent in cache lookups per request.', ['view', 'method']))
+SERIALIZER_SECONDS = REGISTRY.register(Histogram(
+    'inventtrack_request_serializer_duration_seconds', 'Time spent serializing per request.', ['view', 'method']))
+
+
+def pool_stats():
+    """
+    Returns `{alias: stats}` from psycopg_pool's `get_stats()` for each database using Django's
+    connection pool (`OPTIONS['pool']`). Counters are cumulative for the life of the process.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        if connection.settings_dict.get('OPTIONS', {}).get('pool') and getattr(connection, 'pool', None) is not None:
+            stats[alias] = connection.pool.get_stats()
+    return stats
+
+
+def pool_metric(name, documentation, kind, key, scale=1):
+    def samples():
+        return [((alias,), stats.get(key, 0) * scale) for alias, stats in pool_stats().items()]
+    return REGISTRY.register(CallbackMetric(name, documentation, kind, samples, ['database']))
+
+
+pool_metric('inventtrack_db_pool_size', 'Connections currently held by the pool.', 'gauge', 'pool_size')
+pool_metric('inventtrack_db_pool_available', 'Idle connections ready in the pool.', 'gauge', 'pool_available')
+pool_metric('inventtrack_db_pool_max_size', 'Configured maximum pool size.', 'gauge', 'pool_max')
+pool_metric('inventtrack_db_pool_waiting', 'Requests currently waiting for a connection.', 'gauge', 'requests_waiting')
+pool_metric('inventtrack_db_pool_requests_total', 'Connections requested from the pool.', 'counter', 'requests_num')
+pool_metric('inventtrack_db_pool_queued_requests_total', 'Requests that had to wait for a connection.', 'counter', 'requests_queued')
+pool_metric('inventtrack_db_pool_wait_seconds_total', 'Total time spent waiting for a connection.', 'counter', 'requests_wait_ms', 0.001)
+pool_metric('inventtrack_db_pool_errors_total', 'Connection requests that timed out or failed.', 'counter', 'requests_errors')
+pool_metric('inventtrack_db_pool_connections_lost_total', 'Connections found broken by the health check.', 'counter', 'connections_lost')
+
+
+def dropped_log_records():
+    return [((handler.get_name() or 'queue',), handler.dropped) for handler in BackgroundQueueHandler.instances]
+
+
+REGISTRY.register(CallbackMetric(
+    'inventtrack_log_records_dropped_total', 'Log records dropped because the background log queue was full.',
+    'counter', dropped_log_records, ['handler']))
+
+
+class MetricsMiddleware:
+    """
+    Records per-URL-name latency, SQL, cache and serializer metrics for every request, and adds a
+    `Server-Timing` header when `METRICS_SERVER_TIMING` is on. Install it first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_wrapper, dispatch_uid='metrics-query-wrapper')
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        elapsed = time.perf_counter() - metrics.started
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match is not None else 'unmatched'
+        labels = (view, request.method)
+        serializer_seconds = metrics.timings.get('serializer', 0.0)
+
+        REQUESTS.inc((view, request.method, str(response.status_code)))
+        REQUEST_SECONDS.observe(labels, elapsed)
+        DB_QUERIES.observe(labels, metrics.db_queries)
+        DB_SECONDS.observe(labels, metrics.db_seconds)
+        if metrics.cache_hits or metrics.cache_misses:
+            CACHE_LOOKUPS.inc((view, 'hit'), metrics.cache_hits)
+            CACHE_LOOKUPS.inc((view, 'miss'), metrics.cache_misses)
+            CACHE_SECONDS.observe(labels, metrics.cache_seconds)
+        SERIALIZER_SECONDS.observe(labels, serializer_seconds)
+
+        if getattr(settings, 'METRICS_SERVER_TIMING', False):
+            response['Server-Timing'] = ', '.join([
+                f'total;dur={elapsed * 1000:.2f}',
+                f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.db_queries} queries"',
+                f'cache;dur={metrics.cache_seconds * 1000:.2f};desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+                f'serializer;dur={serializer_seconds * 1000:.2f}',
+            ])
+        return response
+
+
+def metrics_view(request):
+    """
+    Serves the registry in the Prometheus text exposition format. When `METRICS_TOKEN` is set,
+    scrapers must send it as a Bearer token; otherwise only clients whose address is in
+    `METRICS_ALLOWED_IPS` (loopback by default) are served.
+    """
+    expected = getattr(settings, 'METRICS_TOKEN', None)
+    if expected:
+        provided = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            return HttpResponseForbidden()
+    elif request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1')):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
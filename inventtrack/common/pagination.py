@@ -0,0 +1,112 @@
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+
+class InvalidCursor(Exception):
+    """
+    Raised when a pagination cursor cannot be decoded or does not match the ordering.
+    """
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) paginator that seeks past the last row of the previous page
+    instead of using OFFSET, so every page costs the same index range scan.
+    """
+    def __init__(self, ordering, default_page_size=None, max_page_size=None):
+        self.ordering = tuple(ordering)
+        self.default_page_size = default_page_size or getattr(settings, 'INVENTORY_PAGE_SIZE', 50)
+        self.max_page_size = max_page_size or getattr(settings, 'INVENTORY_MAX_PAGE_SIZE', 500)
+
+    def get_page_size(self, request):
+        """
+        Reads the `page_size` query parameter and clamps it to the configured maximum.
+        """
+        try:
+            page_size = int(request.GET.get('page_size', self.default_page_size))
+        except (TypeError, ValueError):
+            return self.default_page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, row):
+        """
+        Encodes the ordering values of the given row into an opaque URL-safe cursor.
+        """
+        values = []
+        for field in self.ordering:
+            value = getattr(row, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, queryset, cursor):
+        """
+        Decodes a cursor produced by `encode_cursor` back into typed field values.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            raise InvalidCursor("Malformed cursor.")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor("Cursor does not match the requested ordering.")
+
+        model_meta = queryset.model._meta
+        try:
+            return [
+                model_meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise InvalidCursor("Cursor contains invalid values.")
+
+    def seek_filter(self, values):
+        """
+        Builds the row-value comparison `(a, b) > (x, y)` as an OR of prefixes, honouring
+        the direction of each ordering field. The OR alone cannot start an index range scan
+        on PostgreSQL, so it is ANDed with the sargable bound `a >= x` (`a <= x` descending)
+        on the leading field, which makes deep pages seek straight to their position.
+        """
+        first = self.ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]})
+        condition = Q()
+        for position, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            prefix = {
+                previous.lstrip('-'): value
+                for previous, value in zip(self.ordering[:position], values[:position])
+            }
+            condition |= Q(**prefix, **{f'{name}__{lookup}': values[position]})
+        return bound & condition
+
+    def page_queryset(self, queryset, request):
+        """
+        Returns `(queryset, page_size)`: the query for the requested page plus one look-ahead row.
+        """
+        page_size = self.get_page_size(request)
+        cursor = request.GET.get('cursor')
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(self.decode_cursor(queryset, cursor)))
+        return queryset[:page_size + 1], page_size
+
+    def paginate(self, queryset, request):
+        """
+        Returns `(rows, next_cursor)` for the page requested by the `cursor` query parameter.
+        """
+        queryset, page_size = self.page_queryset(queryset, request)
+        return self.page(list(queryset), page_size)
+
+    async def apaginate(self, queryset, request):
+        """
+        Async variant of `paginate`, fetching the page with async iteration.
+        """
+        queryset, page_size = self.page_queryset(queryset, request)
+        return self.page([row async for row in queryset], page_size)
+
+    def page(self, rows, page_size):
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = self.encode_cursor(rows[-1])
+        return rows, next_cursor
@@ -0,0 +1,116 @@
+"""
+Query-count guards. `QueryBudget` counts the SQL statements run inside a block and fails when
+they exceed a limit; `QueryBudgetMiddleware` applies the budgets views declare in `query_budget`
+(`{'GET': 2, ...}`) to every request while `INVENTORY_ENFORCE_QUERY_BUDGETS` is on.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from common.log_utils import LoggerUtility
+
+logger_utility = LoggerUtility()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block or a view runs more queries than its budget allows.
+    """
+    def __init__(self, label, budget, queries):
+        self.label = label
+        self.budget = budget
+        self.queries = queries
+        statements = '\n'.join(f"  {number}. {sql}" for number, sql in enumerate(queries, start=1))
+        super().__init__(f"{label} ran {len(queries)} queries, over its budget of {budget}:\n{statements}")
+
+
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+
+class QueryBudget:
+    """
+    Context manager recording the queries run on one database connection. With a `budget`, leaving
+    the block raises QueryBudgetExceeded when more queries than that were executed. Transaction
+    control statements are not counted, as whether they are issued depends on the backend and on
+    the enclosing transaction (e.g. savepoints inside a test case).
+
+        with QueryBudget(2, label='item listing'):
+            client.get('/inventory/items/')
+    """
+    def __init__(self, budget=None, using=DEFAULT_DB_ALIAS, label='Block'):
+        self.budget = budget
+        self.using = using
+        self.label = label
+        self.queries = []
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def __enter__(self):
+        self._wrapper = connections[self.using].execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.check()
+
+    def check(self, budget=None):
+        budget = self.budget if budget is None else budget
+        if budget is not None and self.count > budget:
+            raise QueryBudgetExceeded(self.label, budget, self.queries)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the queries of each request and fails it when the resolved view declares a
+    `query_budget` for the request method and goes over it. Does nothing unless
+    `INVENTORY_ENFORCE_QUERY_BUDGETS` is set, so it is meant for development and tests.
+    Unsafe requests are only logged: their transaction has committed by the time the count is
+    known, and failing the response would hide a change that was persisted.
+    """
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not getattr(settings, 'INVENTORY_ENFORCE_QUERY_BUDGETS', False):
+            return self.get_response(request)
+
+        counter = QueryBudget(label=f"{request.method} {request.path}")
+        with counter:
+            response = self.get_response(request)
+
+        budget = self.get_budget(request)
+        if budget is not None and counter.count > budget:
+            logger_utility.log_error(f"{counter.label} ran {counter.count} queries, over its budget of {budget}")
+            if request.method in self.safe_methods:
+                counter.check(budget)
+        return response
+
+    async def __acall__(self, request):
+        # Async views run their queries in worker threads, out of reach of a per-connection wrapper.
+        return await self.get_response(request)
+
+    def get_budget(self, request):
+        match = getattr(request, 'resolver_match', None)
+        view_class = getattr(getattr(match, 'func', None), 'view_class', None)
+        budgets = getattr(view_class, 'query_budget', None) or {}
+        method = 'GET' if request.method == 'HEAD' else request.method
+        return budgets.get(method)
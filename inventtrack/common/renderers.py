@@ -0,0 +1,22 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data):
+    """
+    Encodes `data` to the same bytes as DRF's JSONRenderer: compact separators, UTF-8 without
+    ASCII escaping, and U+2028/U+2029 escaped so the output is also valid JavaScript.
+    """
+    body = None
+    if orjson is not None:
+        try:
+            body = orjson.dumps(data)
+        except orjson.JSONEncodeError:
+            pass
+    if body is None:
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':'), allow_nan=False).encode()
+    return body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
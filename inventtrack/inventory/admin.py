@@ -16,6 +16,22 @@ class ItemAdmin(admin.ModelAdmin):
     list_display=("id", "name","sku", "quantity", "category", "price")
     fields = ("category","name","description", "sku", "quantity", "price", "created_by", "updated_by", "created_at", "updated_at")
     readonly_fields=("created_at","updated_at")
+
+class StockMovementAdmin(admin.ModelAdmin):
+    """
+    Admin class for browsing the append-only stock ledger in the Django admin interface.
+    """
+    list_display=("id", "item", "delta", "reason", "created_by", "created_at")
+    readonly_fields=("item", "delta", "reason", "created_by", "created_at")
+
+class StockSnapshotAdmin(admin.ModelAdmin):
+    """
+    Admin class for browsing compacted stock snapshots in the Django admin interface.
+    """
+    list_display=("id", "item", "quantity", "taken_at")
+    readonly_fields=("item", "quantity", "taken_at")
  
 admin.site.register(models.Category, CategoryAdmin)
 admin.site.register(models.Item, ItemAdmin)
+admin.site.register(models.StockMovement, StockMovementAdmin)
+admin.site.register(models.StockSnapshot, StockSnapshotAdmin)
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        from . import signals  # noqa: F401  Connects the category cache invalidation receivers.
+
+        if getattr(settings, 'INVENTORY_CACHE_PRELOAD', False):
+            from django.core.signals import request_started
+            from .caching import start_preloader
+            request_started.connect(start_preloader, dispatch_uid='inventory-item-cache-preload')
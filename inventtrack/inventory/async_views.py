@@ -0,0 +1,148 @@
+"""
+Native async versions of the item and category read endpoints and of stock adjustments, routed
+in place of the sync views when `INVENTORY_ASYNC_VIEWS` is on (the default under `asgi.py`).
+
+Reads use the async path of the read-through cache, so cache hits are served on the event loop
+(through `redis.asyncio` with django-redis). Cache misses use the async ORM, which in Django 5.1
+still runs every query through `sync_to_async` in a worker thread: database work is not more
+concurrent than with the sync views, only the rest of the request avoids the thread. Stock
+adjustments run the existing transactional `adjust_stock` in a worker thread, as the async ORM has
+no transactions. Methods without an async implementation on
+a shared route (item PUT/DELETE, the as-of stock read, NDJSON streaming, category search) are handed
+to the sync views.
+"""
+import json
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from rest_framework import status
+from common.async_views import AsyncTokenView, json_response
+from common.conditional import is_not_modified, not_modified, rows_etag, set_validators
+from common.log_utils import LoggerUtility
+from common.metrics import timer
+from common.pagination import KeysetPaginator, InvalidCursor
+from .caching import item_cache, aload_item, entry_response
+from .fast_serializers import CategoryFastSerializer, ItemFastSerializer
+from .models import Category, Item
+from .stock import adjust_stock, StockAdjustmentError
+from .views import CategoryConfiguration, ItemConfiguration, ItemFilterMixin, StockAdjustment, StockAdjustmentMixin
+
+logger_utility = LoggerUtility()
+
+
+class AsyncCategoryListing(AsyncTokenView):
+    """
+    Async GET /categories/. NDJSON streaming and `?search=` are served by the sync view.
+    """
+    required_permissions = CategoryConfiguration.required_permissions
+    sync_view = CategoryConfiguration.as_view(http_method_names=['get'])
+
+    async def get(self, request):
+        """
+        Retrieves a page of categories.
+        """
+        if request.GET.get('stream') in ('1', 'true', 'ndjson') or request.GET.get('search', '').strip():
+            return await self.delegate(request)
+
+        logger_utility.logger.info("GET /categories (async)")
+        categories = Category.objects.all()
+        paginator = KeysetPaginator(('id',))
+        try:
+            categories, next_cursor = await paginator.apaginate(categories.only('id', 'name', 'updated_at'), request)
+        except InvalidCursor as e:
+            logger_utility.log_error(f"Invalid category cursor: {e}")
+            return json_response({"message": "Invalid query parameters.", "detail": str(e)}, status.HTTP_400_BAD_REQUEST)
+
+        etag, last_modified = rows_etag(categories, next_cursor)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+
+        serializer = CategoryFastSerializer()
+        with timer('serializer'):
+            data = {
+                "results": [serializer.to_representation((category.id, category.name)) for category in categories],
+                "next_cursor": next_cursor,
+            }
+        return set_validators(json_response(data), etag, last_modified)
+
+
+class AsyncItemConfiguration(AsyncTokenView):
+    """
+    Async GET /item/<pk>/ through the read-through item cache. PUT and DELETE are served by the sync view.
+    """
+    required_permissions = ItemConfiguration.required_permissions
+    sync_view = ItemConfiguration.as_view(http_method_names=['put', 'delete'])
+
+    async def get(self, request, pk):
+        """
+        Retrieves an item, returning the pre-rendered cached body or a 304.
+        """
+        logger_utility.logger.info(f"GET /item/{pk} (async)")
+        entry = await item_cache.aget_or_load(pk, lambda: aload_item(pk))
+        if entry is None:
+            logger_utility.log_error(f"Item {pk} not found.")
+            return json_response({"message": "Item not found."}, status.HTTP_404_NOT_FOUND)
+        if is_not_modified(request, entry.etag, entry.last_modified):
+            return not_modified(entry.etag, entry.last_modified)
+        return entry_response(entry, request)
+
+
+class AsyncItemListing(ItemFilterMixin, AsyncTokenView):
+    """
+    Async GET /items/ with the same keyset pagination, filters and validators as ItemListing.
+    """
+    required_permissions = {
+        'GET': ["view_item"],
+    }
+
+    async def get(self, request):
+        """
+        Retrieves a page of items ordered by (updated_at, id) starting after the given cursor.
+        """
+        logger_utility.logger.info("GET /items (async)")
+        ordering = request.GET.get('ordering', 'updated_at')
+        if ordering not in self.orderings:
+            logger_utility.log_error(f"Invalid item ordering: {ordering}")
+            return json_response({"message": f"ordering must be one of {list(self.orderings)}."}, status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPaginator(self.orderings[ordering])
+        try:
+            versions, next_cursor = await paginator.apaginate(self.filter_queryset(request).only('id', 'updated_at'), request)
+        except (InvalidCursor, ValidationError, ValueError) as e:
+            logger_utility.log_error(f"Invalid item listing parameters: {e}")
+            return json_response({"message": "Invalid query parameters.", "detail": str(e)}, status.HTTP_400_BAD_REQUEST)
+
+        etag, last_modified = rows_etag(versions, next_cursor)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+
+        items = await ItemFastSerializer().adata_by_id([row.id for row in versions])
+        data = {"results": [items[row.id] for row in versions if row.id in items], "next_cursor": next_cursor}
+        return set_validators(json_response(data), etag, last_modified)
+
+
+class AsyncStockAdjustment(StockAdjustmentMixin, AsyncTokenView):
+    """
+    Async POST /item/<pk>/stock/ and /items/stock/. The as-of read is served by the sync view.
+    """
+    required_permissions = StockAdjustment.required_permissions
+    sync_view = StockAdjustment.as_view(http_method_names=['get'])
+
+    async def post(self, request, pk=None):
+        """
+        Applies a single `delta` to item `pk`, or a list of `{id, delta}` adjustments when no pk is given.
+        """
+        logger_utility.logger.info(f"POST /item/{pk}/stock (async)" if pk else "POST /items/stock (async)")
+        try:
+            data = json.loads(request.body)
+        except ValueError as e:
+            return json_response({"detail": f"JSON parse error - {e}"}, status.HTTP_400_BAD_REQUEST)
+
+        deltas, errors = self.get_deltas(data, pk)
+        if errors is not None:
+            return json_response(errors, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            quantities = await sync_to_async(adjust_stock)(deltas, request.user)
+        except StockAdjustmentError as e:
+            return json_response(*self.adjustment_error(e))
+        return json_response(self.adjustment_result(quantities, pk))
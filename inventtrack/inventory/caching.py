@@ -0,0 +1,230 @@
+"""
+Cache of items, keyed by item id, shared by every view that reads or writes items.
+
+Entries hold the final rendered JSON body (gzip-compressed above a size threshold) together with
+its validators, so a cache hit is answered, or turned into a 304, without any JSON parsing or
+encoding.
+
+Entries are loaded from the primary database, so a lagging replica cannot put a stale version in
+the long-lived cache. Reads are counted per item so that, after a cache restart or deploy, the most
+read items are warmed first (`warm_item_cache`, the `warm_item_cache` command and the optional
+preloader started on a worker's first request).
+"""
+import gzip
+import threading
+import time
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connections
+from django.http import HttpResponse
+from common.cache_helpers import NOT_FOUND, ReadThroughCache
+from common.conditional import make_etag, gzip_etag, set_validators
+from common.db_router import use_primary
+from common.log_utils import LoggerUtility
+from common.renderers import dumps
+from .fast_serializers import ItemFastSerializer
+from .models import Item
+
+logger_utility = LoggerUtility()
+
+item_cache = ReadThroughCache('item', track_access=True)
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'etag', 'last_modified', 'encoding'])
+
+
+def item_etag(pk, updated_at):
+    """
+    Returns the strong ETag of an item version.
+    """
+    return make_etag(int(pk), updated_at.isoformat())
+
+
+def build_entry(data, updated_at):
+    """
+    Renders serialized item data into a cache entry.
+    """
+    return body_entry(data['id'], dumps(data), updated_at)
+
+
+def body_entry(pk, body, updated_at):
+    """
+    Wraps a rendered item body into a cache entry, compressing bodies above
+    `INVENTORY_CACHE_COMPRESS_MIN_BYTES` (None disables compression).
+    """
+    etag = item_etag(pk, updated_at)
+    threshold = getattr(settings, 'INVENTORY_CACHE_COMPRESS_MIN_BYTES', None)
+    if threshold is not None and len(body) >= threshold:
+        return CachedResponse(gzip.compress(body, compresslevel=6), etag, updated_at, 'gzip')
+    return CachedResponse(body, etag, updated_at, None)
+
+
+def entry_body(entry):
+    """
+    Returns the uncompressed JSON body of a cache entry.
+    """
+    return gzip.decompress(entry.body) if entry.encoding == 'gzip' else entry.body
+
+
+def entry_response(entry, request):
+    """
+    Builds the HTTP response for a cache entry, passing compressed bodies through untouched to
+    clients that accept gzip. The compressed representation gets its own ETag.
+    """
+    accepts_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if entry.encoding == 'gzip' and accepts_gzip:
+        response = HttpResponse(entry.body, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+        response['ETag'] = gzip_etag(entry.etag)
+    else:
+        response = HttpResponse(entry_body(entry), content_type='application/json')
+    response['Vary'] = 'Accept-Encoding'
+    return set_validators(response, entry.etag, entry.last_modified)
+
+
+def load_item(pk):
+    """
+    Loads and renders item `pk` for the cache, or returns None if it does not exist.
+    """
+    with use_primary():
+        for item_id, body, updated_at in ItemFastSerializer().render(Item.objects.filter(id=pk)):
+            return body_entry(item_id, body, updated_at)
+    return None
+
+
+async def aload_item(pk):
+    """
+    Async variant of `load_item`.
+    """
+    with use_primary():
+        async for item_id, body, updated_at in ItemFastSerializer().arender(Item.objects.filter(id=pk)):
+            return body_entry(item_id, body, updated_at)
+    return None
+
+
+def load_items(item_ids):
+    """
+    Loads and renders the given items for the cache in one query, returning `{id: entry}` for
+    those that exist.
+    """
+    with use_primary():
+        return {
+            item_id: body_entry(item_id, body, updated_at)
+            for item_id, body, updated_at in ItemFastSerializer().render(Item.objects.filter(id__in=item_ids))
+        }
+
+
+def refresh_items(item_ids):
+    """
+    Re-renders the given items and writes them to the cache in one `set_many` round trip.
+    """
+    item_cache.set_many(load_items(item_ids))
+
+
+def get_or_load_items(item_ids):
+    """
+    Returns `{id: entry}` for the existing items among `item_ids`: cached entries come from one
+    `get_many`, misses are loaded with one query and written back with one `set_many`. Ids that
+    match no item are cached as NOT_FOUND for `NEGATIVE_TIMEOUT`, so repeated lookups of unknown
+    ids do not reach the database.
+    """
+    entries = item_cache.get_many(item_ids, include_missing=True)
+    missing = [item_id for item_id in item_ids if item_id not in entries]
+    if missing:
+        loaded = load_items(missing)
+        item_cache.set_many(loaded)
+        item_cache.set_missing([item_id for item_id in missing if item_id not in loaded])
+        entries.update(loaded)
+    return {item_id: entry for item_id, entry in entries.items() if entry != NOT_FOUND}
+
+
+class ItemCacheWarmer:
+    """
+    Adds rendered items to the cache in batches of `batch_size`, throttled to `rate` items per
+    second across all the querysets it warms. Each batch is read with its own short keyset query
+    rather than one long-lived cursor, and only fills absent keys, so a slow warm never overwrites
+    entries that writers refreshed in the meantime.
+    """
+    def __init__(self, batch_size=500, rate=None, progress=None):
+        self.batch_size = batch_size
+        self.rate = rate
+        self.progress = progress
+        self.written = 0
+        self.processed = 0
+        self.started = time.monotonic()
+
+    def warm(self, queryset, skip=()):
+        """
+        Warms the items of `queryset` in id order, leaving out ids in `skip`.
+        """
+        serializer = ItemFastSerializer()
+        last_id = 0
+        while True:
+            with use_primary():
+                rows = list(serializer.render(queryset.filter(id__gt=last_id).order_by('id')[:self.batch_size]))
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            batch = {
+                item_id: body_entry(item_id, body, updated_at)
+                for item_id, body, updated_at in rows
+                if item_id not in skip
+            }
+            if batch:
+                self.write(batch)
+
+    def write(self, batch):
+        self.written += item_cache.add_many(batch)
+        self.processed += len(batch)
+        if self.progress is not None:
+            self.progress(self.written)
+        if self.rate:
+            delay = self.processed / self.rate - (time.monotonic() - self.started)
+            if delay > 0:
+                time.sleep(delay)
+
+
+def warm_item_cache(hot_limit=None, hot_only=False, batch_size=500, rate=None, progress=None):
+    """
+    Warms the `hot_limit` most read items first, then, unless `hot_only`, every other item in id
+    order. Returns the number of entries added; items already cached are left as they are.
+    """
+    warmer = ItemCacheWarmer(batch_size, rate, progress)
+    hot_ids = item_cache.hottest(hot_limit)
+    for start in range(0, len(hot_ids), batch_size):
+        warmer.warm(Item.objects.filter(id__in=hot_ids[start:start + batch_size]))
+    if not hot_only:
+        warmer.warm(Item.objects.all(), skip=set(hot_ids))
+    return warmer.written
+
+
+_preload_started = threading.Lock()
+
+
+def start_preloader(**kwargs):
+    """
+    `request_started` receiver that warms the hottest items in a background thread. It runs on a
+    worker's first request, after any fork. Only the first worker to take the shared preload lock
+    does the warming.
+    """
+    if not _preload_started.acquire(blocking=False):
+        return
+    request_started.disconnect(start_preloader, dispatch_uid='inventory-item-cache-preload')
+    if cache.add(item_cache.key('preload'), 1, getattr(settings, 'INVENTORY_CACHE_PRELOAD_LOCK_TIMEOUT', 600)):
+        threading.Thread(target=preload, name='item-cache-preload', daemon=True).start()
+
+
+def preload():
+    started = time.monotonic()
+    try:
+        written = warm_item_cache(
+            hot_limit=getattr(settings, 'INVENTORY_CACHE_PRELOAD_LIMIT', 10000),
+            hot_only=True,
+            rate=getattr(settings, 'INVENTORY_CACHE_PRELOAD_RATE', 2000),
+        )
+        logger_utility.logger.info(f"Preloaded {written} hot items in {time.monotonic() - started:.1f}s")
+    except Exception as e:
+        logger_utility.log_error(f"Item cache preload failed: {e}")
+    finally:
+        connections.close_all()
@@ -0,0 +1,165 @@
+"""
+Streaming export of items joined with their category, as CSV or NDJSON.
+
+Rows are read through `.iterator(chunk_size=...)` over a joined `values_list()`, which uses a
+server-side cursor on PostgreSQL, and encoded one chunk at a time. Memory stays flat however many
+items are exported.
+
+Each export comes with a watermark. Passing it back as `since` exports only the items updated
+after it. `updated_at` is assigned by the application before the row is written, so a row can
+become visible long after its timestamp when its transaction is slow to commit (a large import
+or bulk update). On PostgreSQL the watermark is therefore the earlier of the export's start and
+the start of the oldest transaction still open on the primary, minus
+`INVENTORY_EXPORT_WATERMARK_LAG` seconds. The lag covers the gap between taking `updated_at` and
+opening the transaction, and replication lag when reading from a replica. Other backends only
+subtract the lag, so there a transaction committing more than the lag after its timestamps can be
+missed by incremental exports; raise the lag accordingly.
+
+Items updated within the window can appear in two consecutive exports, so consumers should upsert
+on `id`. Deleted items are not reported by incremental exports.
+
+Under ASGI, `async_chunks` hands the stream to Django as an async iterator. Django would otherwise
+read a sync iterator into a list before sending anything.
+"""
+import csv
+import io
+import zlib
+from datetime import timedelta
+from itertools import chain, islice
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+from common.renderers import dumps
+from .fast_serializers import ItemFastSerializer
+from .models import Item
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+# Start of the oldest open transaction in this database, other than the export's own. Sessions of
+# other database users are only visible with the pg_read_all_stats role.
+OLDEST_TRANSACTION_SQL = """
+    SELECT MIN(xact_start) FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid() AND xact_start IS NOT NULL
+"""
+
+
+def oldest_open_transaction():
+    """
+    Returns the start time of the oldest transaction open on the primary, or None when there is
+    none or the backend cannot tell.
+    """
+    connection = connections[router.db_for_write(Item)]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(OLDEST_TRANSACTION_SQL)
+        return cursor.fetchone()[0]
+
+
+def export_watermark():
+    """
+    Returns the watermark of an export starting now.
+    """
+    start = timezone.now()
+    oldest = oldest_open_transaction()
+    if oldest is not None:
+        start = min(start, oldest)
+    return start - timedelta(seconds=getattr(settings, 'INVENTORY_EXPORT_WATERMARK_LAG', 60))
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    Compresses a stream of byte chunks into a single gzip stream.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def async_chunks(chunks):
+    """
+    Iterates a sync stream of byte chunks from async code, one chunk per `sync_to_async` call. The
+    calls are thread-sensitive, so the database cursor stays on the thread that opened it.
+    """
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
+
+
+class ItemExporter:
+    """
+    Encodes items with their category name as CSV or NDJSON, in chunks of `chunk_size` rows. Prices
+    are formatted like the API's and timestamps as ISO 8601.
+    """
+    columns = (
+        'id', 'sku', 'name', 'description', 'category_id', 'category__name', 'quantity', 'price',
+        'created_by__email', 'updated_by__email', 'created_at', 'updated_at',
+    )
+    header = (
+        'id', 'sku', 'name', 'description', 'category_id', 'category', 'quantity', 'price',
+        'created_by', 'updated_by', 'created_at', 'updated_at',
+    )
+
+    def __init__(self, output='csv', chunk_size=None):
+        if output not in FORMATS:
+            raise ValueError(f"output must be one of {list(FORMATS)}.")
+        self.output = output
+        self.content_type = FORMATS[output]
+        self.chunk_size = chunk_size or getattr(settings, 'INVENTORY_EXPORT_CHUNK_SIZE', 5000)
+        self.format_price = ItemFastSerializer().format_price
+
+    def queryset(self, since=None):
+        """
+        Returns the rows to export. Incremental exports walk the (updated_at, id) index, full exports
+        the primary key.
+        """
+        items = Item.objects.all()
+        if since is None:
+            items = items.order_by('id')
+        else:
+            items = items.filter(updated_at__gt=since).order_by('updated_at', 'id')
+        return items.values_list(*self.columns)
+
+    def format_row(self, row):
+        pk, sku, name, description, category_id, category, quantity, price, created_by, updated_by, created_at, updated_at = row
+        return (
+            pk, sku, name, description, category_id, category, quantity, self.format_price(price),
+            created_by, updated_by, created_at.isoformat(), updated_at.isoformat(),
+        )
+
+    def encode(self, rows):
+        if self.output == 'ndjson':
+            return b''.join(dumps(dict(zip(self.header, self.format_row(row)))) + b"\n" for row in rows)
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(self.format_row(row) for row in rows)
+        return buffer.getvalue().encode()
+
+    def stream(self, since=None, compress=False, progress=None):
+        """
+        Yields the export as byte chunks, CSV starting with a header line, optionally gzip-compressed.
+        `progress(rows)` is called with the running row count after each chunk.
+        """
+        chunks = self.chunks(self.queryset(since), progress)
+        if self.output == 'csv':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(self.header)
+            chunks = chain([buffer.getvalue().encode()], chunks)
+        return gzip_chunks(chunks) if compress else chunks
+
+    def chunks(self, queryset, progress=None):
+        rows = queryset.iterator(chunk_size=self.chunk_size)
+        exported = 0
+        while chunk := list(islice(rows, self.chunk_size)):
+            exported += len(chunk)
+            yield self.encode(chunk)
+            if progress is not None:
+                progress(exported)
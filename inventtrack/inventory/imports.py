@@ -0,0 +1,229 @@
+"""
+Bulk import of items from CSV, keyed on `sku`.
+
+Rows are read from the CSV stream and validated in chunks of `INVENTORY_IMPORT_CHUNK_SIZE`. Each
+chunk takes one query each for the category ids, category names and item names it references.
+Rejected rows go to an optional reject CSV with their line number and errors. Valid rows are
+loaded into the ItemImportRow staging table with `COPY` on PostgreSQL and `bulk_create` elsewhere.
+
+The staged batch is then merged into Item in one transaction:
+- the existing items of the batch are locked before their quantities are read, so concurrent
+  stock adjustments are not overwritten or miscounted
+- a single `INSERT ... SELECT ... ON CONFLICT (sku) DO UPDATE` upsert, which leaves unchanged items
+  untouched
+- one `INSERT ... SELECT` that records the quantity changes, and a `create` movement for every
+  new item, in the stock ledger
+
+Cached entries of updated items are refreshed after the commit.
+
+Every row carries the full state of its item, so an empty `description` or category clears it.
+"""
+import csv
+import json
+import uuid
+from itertools import islice
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from common.log_utils import LoggerUtility
+from .models import Category, Item, ItemImportRow, StockMovement
+from .serializers import ItemImportRowSerializer
+from .signals import refresh_cached_items
+
+logger_utility = LoggerUtility()
+
+REQUIRED_COLUMNS = ('sku', 'name', 'quantity', 'price')
+STAGED_FIELDS = ('batch', 'line', 'sku', 'name', 'description', 'category_id', 'quantity', 'price')
+MAX_REPORTED_REJECTS = 100
+
+UPSERT_SQL = """
+    INSERT INTO {item} (sku, name, description, category_id, quantity, price, created_by_id, updated_by_id, created_at, updated_at)
+    SELECT sku, name, description, category_id, quantity, price, %s, %s, %s, %s FROM {staging} WHERE batch = %s
+    ON CONFLICT (sku) DO UPDATE SET
+        name = EXCLUDED.name, description = EXCLUDED.description, category_id = EXCLUDED.category_id,
+        quantity = EXCLUDED.quantity, price = EXCLUDED.price,
+        updated_by_id = EXCLUDED.updated_by_id, updated_at = EXCLUDED.updated_at
+    WHERE {item}.name <> EXCLUDED.name OR {item}.quantity <> EXCLUDED.quantity OR {item}.price <> EXCLUDED.price
+        OR NOT COALESCE({item}.description = EXCLUDED.description, {item}.description IS NULL AND EXCLUDED.description IS NULL)
+        OR NOT COALESCE({item}.category_id = EXCLUDED.category_id, {item}.category_id IS NULL AND EXCLUDED.category_id IS NULL)
+"""
+
+# Locks the existing items of a batch, in id order, so their quantities cannot change between
+# reading them and the upsert.
+LOCK_SQL = """
+    SELECT COUNT(*) FROM (
+        SELECT id FROM {item} WHERE sku IN (SELECT sku FROM {staging} WHERE batch = %s) ORDER BY id FOR UPDATE
+    ) locked
+"""
+
+PREVIOUS_QUANTITY_SQL = """
+    UPDATE {staging} SET previous_quantity = (SELECT quantity FROM {item} WHERE {item}.sku = {staging}.sku)
+    WHERE batch = %s
+"""
+
+MOVEMENTS_SQL = """
+    INSERT INTO {movement} (item_id, delta, reason, created_by_id, created_at)
+    SELECT {item}.id, {staging}.quantity - COALESCE({staging}.previous_quantity, 0),
+        CASE WHEN {staging}.previous_quantity IS NULL THEN 'create' ELSE 'update' END, %s, %s
+    FROM {staging} INNER JOIN {item} ON {item}.sku = {staging}.sku
+    WHERE {staging}.batch = %s
+        AND ({staging}.previous_quantity IS NULL OR {staging}.quantity <> {staging}.previous_quantity)
+"""
+
+
+class ItemImportError(Exception):
+    """
+    Raised when an import file is not an item CSV or its batch cannot be merged.
+    """
+
+
+class ItemImporter:
+    """
+    Imports items from CSV for `user`, who is recorded as creator and updater. Call `run()` with an
+    iterable of text lines. `progress(counts)` is called after each chunk is staged.
+    """
+    def __init__(self, user, chunk_size=None, rejects=None, progress=None):
+        self.user = user
+        self.chunk_size = chunk_size or getattr(settings, 'INVENTORY_IMPORT_CHUNK_SIZE', 5000)
+        self.rejects = rejects
+        self.progress = progress
+        self.batch = uuid.uuid4()
+        self.seen = {'sku': set(), 'name': set()}
+        self.reported = []
+        self.counts = {'rows': 0, 'staged': 0, 'rejected': 0, 'created': 0, 'updated': 0, 'unchanged': 0}
+
+    def run(self, lines):
+        """
+        Validates, stages and merges the CSV, returning the row counts.
+        """
+        reader = csv.DictReader(lines)
+        columns = reader.fieldnames or []
+        missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ItemImportError(f"Missing columns: {', '.join(missing)}.")
+        self.reject_writer = csv.writer(self.rejects) if self.rejects is not None else None
+        if self.reject_writer is not None:
+            self.reject_writer.writerow(['line', 'errors', *columns])
+        self.columns = columns
+
+        logger_utility.logger.info(f"Importing items in batch {self.batch}")
+        records = ((reader.line_num, record) for record in reader)
+        try:
+            while chunk := list(islice(records, self.chunk_size)):
+                self.counts['rows'] += len(chunk)
+                self.stage(self.validate(chunk))
+                if self.progress is not None:
+                    self.progress(self.counts)
+            self.merge()
+        finally:
+            ItemImportRow.objects.filter(batch=self.batch).delete()
+        logger_utility.logger.info(f"Imported batch {self.batch}: {self.counts}")
+        return self.counts
+
+    def validate(self, records):
+        """
+        Returns the staging rows for the valid records of a chunk and rejects the others. Blank
+        cells count as missing.
+        """
+        cleaned = []
+        for line, record in records:
+            data = {key: value.strip() for key, value in record.items() if key in self.columns and value and value.strip()}
+            serializer = ItemImportRowSerializer(data=data)
+            if serializer.is_valid():
+                cleaned.append((line, record, serializer.validated_data))
+            else:
+                self.reject(line, record, serializer.errors)
+
+        category_ids = {row['category_id'] for _, _, row in cleaned if row.get('category_id') is not None}
+        existing_categories = set(Category.objects.filter(id__in=category_ids).values_list('id', flat=True))
+        category_names = {row['category'] for _, _, row in cleaned if row.get('category_id') is None and 'category' in row}
+        categories_by_name = dict(Category.objects.filter(name__in=category_names).values_list('name', 'id'))
+        name_owners = dict(Item.objects.filter(name__in={row['name'] for _, _, row in cleaned}).values_list('name', 'sku'))
+
+        staged = []
+        for line, record, row in cleaned:
+            errors = {}
+            category_id = row.get('category_id')
+            if category_id is not None and category_id not in existing_categories:
+                errors['category_id'] = [f"Category {category_id} does not exist."]
+            elif category_id is None and 'category' in row:
+                category_id = categories_by_name.get(row['category'])
+                if category_id is None:
+                    errors['category'] = [f"Category {row['category']} does not exist."]
+            if row['sku'] in self.seen['sku']:
+                errors['sku'] = ["Duplicate sku in the import."]
+            owner = name_owners.get(row['name'])
+            if row['name'] in self.seen['name'] or (owner is not None and owner != row['sku']):
+                errors['name'] = ["item with this name already exists."]
+            if errors:
+                self.reject(line, record, errors)
+                continue
+
+            self.seen['sku'].add(row['sku'])
+            self.seen['name'].add(row['name'])
+            staged.append(ItemImportRow(
+                batch=self.batch, line=line, sku=row['sku'], name=row['name'], description=row.get('description'),
+                category_id=category_id, quantity=row['quantity'], price=row['price'],
+            ))
+        return staged
+
+    def reject(self, line, record, errors):
+        self.counts['rejected'] += 1
+        if len(self.reported) < MAX_REPORTED_REJECTS:
+            self.reported.append({"line": line, "errors": errors})
+        if self.reject_writer is not None:
+            self.reject_writer.writerow([line, json.dumps(errors), *(record.get(column) for column in self.columns)])
+
+    def stage(self, rows):
+        """
+        Loads staging rows with `COPY` on PostgreSQL and `bulk_create` elsewhere.
+        """
+        if not rows:
+            return
+        if connection.vendor == 'postgresql':
+            quote = connection.ops.quote_name
+            columns = ', '.join(quote(ItemImportRow._meta.get_field(field).column) for field in STAGED_FIELDS)
+            with connection.cursor() as cursor:
+                with cursor.copy(f"COPY {quote(ItemImportRow._meta.db_table)} ({columns}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row([getattr(row, field) for field in STAGED_FIELDS])
+        else:
+            ItemImportRow.objects.bulk_create(rows)
+        self.counts['staged'] += len(rows)
+
+    def merge(self):
+        """
+        Upserts the staged batch into Item and records the stock movements, in one transaction.
+        """
+        if not self.counts['staged']:
+            return
+        quote = connection.ops.quote_name
+        tables = {
+            'item': quote(Item._meta.db_table),
+            'staging': quote(ItemImportRow._meta.db_table),
+            'movement': quote(StockMovement._meta.db_table),
+        }
+        batch = ItemImportRow._meta.get_field('batch').get_db_prep_value(self.batch, connection)
+        now = timezone.now()
+        timestamp = connection.ops.adapt_datetimefield_value(now)
+        staged = ItemImportRow.objects.filter(batch=self.batch)
+
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    if connection.features.has_select_for_update:
+                        cursor.execute(LOCK_SQL.format(**tables), [batch])
+                    cursor.execute(PREVIOUS_QUANTITY_SQL.format(**tables), [batch])
+                    cursor.execute(UPSERT_SQL.format(**tables), [self.user.id, self.user.id, timestamp, timestamp, batch])
+                    cursor.execute(MOVEMENTS_SQL.format(**tables), [self.user.id, timestamp, batch])
+                self.counts['created'] = staged.filter(previous_quantity__isnull=True).count()
+                updated_ids = list(Item.objects.filter(
+                    sku__in=staged.filter(previous_quantity__isnull=False).values('sku'), updated_at=now,
+                ).values_list('id', flat=True))
+                transaction.on_commit(lambda: refresh_cached_items(updated_ids))
+        except IntegrityError as e:
+            logger_utility.log_error(f"Merging import batch {self.batch} failed: {e}")
+            raise ItemImportError(f"The import could not be merged: {e}")
+
+        self.counts['updated'] = len(updated_ids)
+        self.counts['unchanged'] = self.counts['staged'] - self.counts['created'] - self.counts['updated']
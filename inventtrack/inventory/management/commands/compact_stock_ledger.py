@@ -0,0 +1,54 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+from inventory.models import Item, StockMovement, StockSnapshot
+
+class Command(BaseCommand):
+    """
+    Compacts stock movements older than a cutoff into one snapshot per item, so quantity-as-of
+    queries only ever scan the movements recorded since the latest snapshot.
+    """
+    help = "Compacts old stock movements into per-item snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=30, help="Compact movements older than this many days.")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Number of items compacted per transaction.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        chunk_size = options['chunk_size']
+        item_ids = list(
+            StockMovement.objects.filter(created_at__lte=cutoff)
+            .order_by('item_id').values_list('item_id', flat=True).distinct()
+        )
+        self.stdout.write(f"Compacting movements up to {cutoff.isoformat()} for {len(item_ids)} items")
+
+        compacted = 0
+        for start in range(0, len(item_ids), chunk_size):
+            chunk = item_ids[start:start + chunk_size]
+            compacted += self.compact_chunk(chunk, cutoff)
+            self.stdout.write(f"  {min(start + chunk_size, len(item_ids))}/{len(item_ids)} items")
+
+        self.stdout.write(self.style.SUCCESS(f"Compacted {compacted} movements into {len(item_ids)} snapshots"))
+
+    def compact_chunk(self, item_ids, cutoff):
+        """
+        Writes a snapshot at `cutoff` for each item and deletes the movements it replaces.
+        """
+        latest_snapshot = StockSnapshot.objects.filter(item=OuterRef('pk'), taken_at__lte=cutoff).order_by('-taken_at')
+        with transaction.atomic():
+            previous = dict(
+                Item.objects.filter(id__in=item_ids)
+                .annotate(snapshot_quantity=Subquery(latest_snapshot.values('quantity')[:1]))
+                .values_list('id', 'snapshot_quantity')
+            )
+            movements = StockMovement.objects.filter(item_id__in=item_ids, created_at__lte=cutoff)
+            totals = dict(movements.values('item_id').annotate(total=Sum('delta')).values_list('item_id', 'total'))
+            StockSnapshot.objects.bulk_create([
+                StockSnapshot(item_id=item_id, quantity=(previous.get(item_id) or 0) + total, taken_at=cutoff)
+                for item_id, total in totals.items()
+            ])
+            deleted, _ = movements.delete()
+        return deleted
@@ -0,0 +1,45 @@
+import gzip
+from django.core.management.base import BaseCommand, CommandError
+from authentication.models import User
+from inventory.imports import ItemImportError, ItemImporter
+
+class Command(BaseCommand):
+    """
+    Imports items from a CSV file (optionally gzip-compressed), creating or updating them by SKU
+    through a staging table and a single upsert. Rows that fail validation are skipped and, with
+    `--rejects`, written to a CSV file with their line number and errors.
+    """
+    help = "Imports items from a CSV file, keyed on sku."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with sku, name, quantity and price columns (.gz files are decompressed).")
+        parser.add_argument('--user', required=True, help="Email of the user recorded as creator and updater.")
+        parser.add_argument('--rejects', help="Write rejected rows and their errors to this CSV file.")
+        parser.add_argument('--chunk-size', type=int, default=None, help="Rows validated and staged at a time.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options['user']).first()
+        if user is None:
+            raise CommandError(f"User {options['user']} does not exist.")
+
+        opener = gzip.open if options['path'].endswith('.gz') else open
+        rejects = open(options['rejects'], 'w', newline='', encoding='utf-8') if options['rejects'] else None
+        importer = ItemImporter(
+            user,
+            chunk_size=options['chunk_size'],
+            rejects=rejects,
+            progress=lambda counts: self.stdout.write(f"  {counts['rows']} rows read, {counts['rejected']} rejected"),
+        )
+        try:
+            with opener(options['path'], 'rt', newline='', encoding='utf-8-sig') as lines:
+                counts = importer.run(lines)
+        except (ItemImportError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+        finally:
+            if rejects is not None:
+                rejects.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts['staged']} of {counts['rows']} rows: {counts['created']} created, "
+            f"{counts['updated']} updated, {counts['unchanged']} unchanged, {counts['rejected']} rejected"
+        ))
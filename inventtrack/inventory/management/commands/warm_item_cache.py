@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from inventory.caching import warm_item_cache
+
+class Command(BaseCommand):
+    """
+    Fills the item cache after a cache restart or deploy, most read items first, so item reads
+    do not all miss and fall through to the database at once.
+    """
+    help = "Warms the item cache, most read items first."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Items rendered and added to the cache per batch.")
+        parser.add_argument('--rate', type=float, default=0, help="Maximum items warmed per second (0 for no limit).")
+        parser.add_argument('--hot-limit', type=int, default=None, help="Number of most read items warmed first (default: all tracked).")
+        parser.add_argument('--hot-only', action='store_true', help="Only warm the most read items.")
+
+    def handle(self, *args, **options):
+        written = warm_item_cache(
+            hot_limit=options['hot_limit'],
+            hot_only=options['hot_only'],
+            batch_size=options['batch_size'],
+            rate=options['rate'] or None,
+            progress=lambda written: self.stdout.write(f"  {written} items"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Warmed {written} items"))
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_remove_item_inventory_i_created_a8d6f3_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['updated_at', 'id'], name='inventory_i_updated_a1c89e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['category', 'updated_at', 'id'], name='inventory_i_categor_edcd19_idx'),
+        ),
+    ]
@@ -0,0 +1,100 @@
+from django.db import migrations
+
+"""
+Search indexes backing `inventory.search`.
+
+PostgreSQL gets pg_trgm GIN indexes so `ILIKE '%term%'` and trigram similarity
+are served from the index. SQLite gets FTS5 external-content tables using the
+trigram tokenizer, kept in sync with the base tables by triggers. Note that
+SQLite drops triggers when a migration rebuilds the base table, so a later
+migration altering `inventory_item` or `inventory_category` columns must
+recreate them.
+"""
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS inventory_category_name_trgm ON inventory_category USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS inventory_item_name_trgm ON inventory_item USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS inventory_item_sku_trgm ON inventory_item USING gin (sku gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS inventory_item_description_trgm ON inventory_item USING gin (description gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS inventory_category_name_trgm",
+    "DROP INDEX IF EXISTS inventory_item_name_trgm",
+    "DROP INDEX IF EXISTS inventory_item_sku_trgm",
+    "DROP INDEX IF EXISTS inventory_item_description_trgm",
+]
+
+FTS_TABLES = {
+    'inventory_category': ['name'],
+    'inventory_item': ['name', 'sku', 'description'],
+}
+
+
+def sqlite_forward_statements():
+    """
+    Builds the FTS5 table, sync triggers and initial rebuild for each searchable table.
+    """
+    statements = []
+    for table, columns in FTS_TABLES.items():
+        fts = f"{table}_fts"
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f"new.{column}" for column in columns)
+        old_values = ', '.join(f"old.{column}" for column in columns)
+        statements += [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, content='{table}', content_rowid='id', tokenize='trigram')",
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+    return statements
+
+
+def sqlite_reverse_statements():
+    """
+    Drops the triggers and FTS5 tables created by `sqlite_forward_statements`.
+    """
+    statements = []
+    for table in FTS_TABLES:
+        fts = f"{table}_fts"
+        statements += [f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ('ai', 'ad', 'au')]
+        statements.append(f"DROP TABLE IF EXISTS {fts}")
+    return statements
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        run_statements(schema_editor, sqlite_forward_statements())
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_statements(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        run_statements(schema_editor, sqlite_reverse_statements())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_item_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_opening_snapshots(apps, schema_editor):
+    """
+    Records the current quantity of every existing item so ledger queries start from a known balance.
+    """
+    Item = apps.get_model('inventory', 'Item')
+    StockSnapshot = apps.get_model('inventory', 'StockSnapshot')
+    now = django.utils.timezone.now()
+    batch = []
+    for item_id, quantity in Item.objects.order_by('id').values_list('id', 'quantity').iterator(chunk_size=2000):
+        batch.append(StockSnapshot(item_id=item_id, quantity=quantity, taken_at=now))
+        if len(batch) >= 2000:
+            StockSnapshot.objects.bulk_create(batch)
+            batch = []
+    StockSnapshot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('create', 'Item created'), ('update', 'Item updated'), ('adjustment', 'Stock adjustment')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='inventory.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'created_at'], name='inventory_s_item_id_a9fe64_idx'), models.Index(fields=['created_at'], name='inventory_s_created_05ebf5_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventory.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'taken_at'], name='inventory_s_item_id_2c20a9_idx')],
+            },
+        ),
+        migrations.RunPython(create_opening_snapshots, migrations.RunPython.noop),
+    ]
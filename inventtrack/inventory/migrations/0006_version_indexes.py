@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-18 01:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_stock_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['id', 'updated_at'], name='inventory_c_id_7ad9bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['id', 'updated_at'], name='inventory_i_id_76c2b5_idx'),
+        ),
+    ]
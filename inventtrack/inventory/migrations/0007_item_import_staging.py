@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_version_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemImportRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch', models.UUIDField()),
+                ('line', models.PositiveIntegerField()),
+                ('sku', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('category_id', models.BigIntegerField(null=True)),
+                ('quantity', models.PositiveIntegerField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('previous_quantity', models.IntegerField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['batch', 'sku'], name='inventory_i_batch_172f8a_idx')],
+            },
+        ),
+    ]
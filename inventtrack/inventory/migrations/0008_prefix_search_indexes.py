@@ -0,0 +1,44 @@
+from django.db import migrations
+
+"""
+Pattern-ops indexes for the short-term prefix search in `inventory.search`.
+
+On PostgreSQL, `LIKE 'term%'` can only use a b-tree index built with `varchar_pattern_ops` unless
+the database uses the C collation. SQLite answers prefix searches with range scans over the existing
+b-tree indexes, so it needs nothing here.
+"""
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX IF NOT EXISTS inventory_category_name_prefix ON inventory_category (name varchar_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS inventory_item_name_prefix ON inventory_item (name varchar_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS inventory_item_sku_prefix ON inventory_item (sku varchar_pattern_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS inventory_category_name_prefix",
+    "DROP INDEX IF EXISTS inventory_item_name_prefix",
+    "DROP INDEX IF EXISTS inventory_item_sku_prefix",
+]
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_FORWARD:
+            schema_editor.execute(statement)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_REVERSE:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_item_import_staging'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -1,4 +1,7 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Sum
+from django.utils import timezone
 from authentication.models import User
 from common.model_helpers import Base
 
@@ -12,7 +15,10 @@ class Category(Base):
         return self.name
     
     class Meta:
-        indexes = [models.Index(fields=['name']),]
+        indexes = [
+            models.Index(fields=['name']),
+            models.Index(fields=['id', 'updated_at']),
+        ]
 
 class Item(Base):
     """
@@ -35,6 +41,101 @@ class Item(Base):
             models.Index(fields=['name']),
             models.Index(fields=['sku']),
             models.Index(fields=['category']),
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['category', 'updated_at', 'id']),
+            models.Index(fields=['id', 'updated_at']),
+        ]
+
+
+class StockMovementManager(models.Manager):
+    """
+    Manager for the append-only stock ledger.
+    """
+    def record(self, movements):
+        """
+        Appends `(item_id, delta, reason, user)` tuples with a single bulk insert. Zero deltas are
+        skipped, except on creation: the `create` movement marks the start of an item's stock history.
+        """
+        now = timezone.now()
+        rows = [
+            StockMovement(item_id=item_id, delta=delta, reason=reason, created_by=user, created_at=now)
+            for item_id, delta, reason, user in movements
+            if delta or reason == 'create'
+        ]
+        return self.bulk_create(rows, batch_size=getattr(settings, 'INVENTORY_BULK_CHUNK_SIZE', 1000))
+
+    def quantity_as_of(self, item_id, at):
+        """
+        Returns the quantity of an item at time `at` from the nearest earlier snapshot plus the
+        movements recorded after it, or None if the item had no stock history by then.
+        """
+        snapshot = StockSnapshot.objects.filter(item_id=item_id, taken_at__lte=at).order_by('-taken_at').first()
+        movements = self.filter(item_id=item_id, created_at__lte=at)
+        if snapshot:
+            movements = movements.filter(created_at__gt=snapshot.taken_at)
+        total = movements.aggregate(total=Sum('delta'))['total']
+        if snapshot is None and total is None:
+            return None
+        return (snapshot.quantity if snapshot else 0) + (total or 0)
+
+class StockMovement(models.Model):
+    """
+    Append-only record of a change to an item's quantity.
+    """
+    REASON_CHOICES = [
+        ('create', 'Item created'),
+        ('update', 'Item updated'),
+        ('adjustment', 'Stock adjustment'),
+    ]
+
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='stock_movements')
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='stock_movements')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = StockMovementManager()
+
+    def __str__(self):
+        return f"{self.item_id}: {self.delta:+d} ({self.reason})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'created_at']),
+            models.Index(fields=['created_at']),
         ]
 
+class StockSnapshot(models.Model):
+    """
+    Compacted quantity of an item at a point in time, replacing the movements recorded up to it.
+    """
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='stock_snapshots')
+    quantity = models.IntegerField()
+    taken_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.item_id}: {self.quantity} at {self.taken_at}"
+
+    class Meta:
+        indexes = [models.Index(fields=['item', 'taken_at'])]
 
+class ItemImportRow(models.Model):
+    """
+    Validated row of a CSV item import, staged before being merged into Item. Rows of one import
+    share a `batch` and are deleted once it is merged.
+    """
+    batch = models.UUIDField()
+    line = models.PositiveIntegerField()
+    sku = models.CharField(max_length=100)
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    category_id = models.BigIntegerField(null=True)
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    previous_quantity = models.IntegerField(null=True)
+
+    def __str__(self):
+        return f"{self.batch}:{self.line} {self.sku}"
+
+    class Meta:
+        indexes = [models.Index(fields=['batch', 'sku'])]
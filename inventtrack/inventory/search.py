@@ -0,0 +1,139 @@
+"""
+Ranked full-text search over categories and items.
+
+PostgreSQL uses the pg_trgm GIN indexes created by migration 0004, so the
+`ILIKE '%term%'` filters are answered from the index and ranked by trigram
+similarity. SQLite (local and test runs) uses the FTS5 trigram tables kept in
+sync by triggers from the same migration and ranks with bm25. Terms shorter
+than a trigram fall back to a case-sensitive prefix match: `LIKE 'term%'` over
+the `varchar_pattern_ops` indexes of migration 0008 on PostgreSQL, and a range
+scan over the b-tree indexes on SQLite, whose LIKE is case-insensitive and
+cannot use them.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from .models import Category, Item
+
+MIN_TERM_LENGTH = 3
+
+
+class BaseSearchBackend:
+    """
+    Base class for search backends. Subclasses return ranked primary keys for one page.
+    """
+    def search(self, model, term, offset, limit):
+        """
+        Returns up to `limit` primary keys of `model` matching `term`, best match first.
+        """
+        config = SEARCH_FIELDS[model]
+        if len(term) < MIN_TERM_LENGTH:
+            return self.prefix_search(model, config, term, offset, limit)
+        return self.ranked_search(model, config, term, offset, limit)
+
+    def prefix_search(self, model, config, term, offset, limit):
+        """
+        Matches short terms as a prefix of the indexed identifier columns.
+        """
+        condition = Q()
+        for field in config['prefix_fields']:
+            condition |= self.prefix_condition(field, term)
+        return list(model.objects.filter(condition).order_by('id').values_list('id', flat=True)[offset:offset + limit])
+
+    def prefix_condition(self, field, term):
+        return Q(**{f'{field}__startswith': term})
+
+    def ranked_search(self, model, config, term, offset, limit):
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Trigram search using the pg_trgm GIN indexes, ranked by the best similarity across fields.
+    """
+    def ranked_search(self, model, config, term, offset, limit):
+        from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
+
+        condition = Q()
+        similarities = []
+        for field in config['fields']:
+            condition |= Q(**{f'{field}__icontains': term})
+            if field in config['word_fields']:
+                similarities.append(TrigramWordSimilarity(term, field))
+            else:
+                similarities.append(TrigramSimilarity(field, term))
+        rank = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        queryset = model.objects.filter(condition).annotate(rank=rank).order_by('-rank', 'id')
+        return list(queryset.values_list('id', flat=True)[offset:offset + limit])
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    """
+    FTS5 trigram search over the external-content tables, ranked by bm25.
+    """
+    def prefix_condition(self, field, term):
+        # Under SQLite's binary collation, the strings starting with `term` are exactly those in this range.
+        return Q(**{f'{field}__gte': term, f'{field}__lt': term + chr(0x10FFFF)})
+
+    def ranked_search(self, model, config, term, offset, limit):
+        table = config['fts_table']
+        weights = ', '.join(str(weight) for weight in config['weights'])
+        query = '"' + term.replace('"', '""') + '"'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {table} WHERE {table} MATCH %s "
+                f"ORDER BY bm25({table}, {weights}), rowid LIMIT %s OFFSET %s",
+                [query, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+SEARCH_FIELDS = {
+    Category: {
+        'fields': ['name'],
+        'word_fields': [],
+        'prefix_fields': ['name'],
+        'fts_table': 'inventory_category_fts',
+        'weights': [1.0],
+    },
+    Item: {
+        'fields': ['name', 'sku', 'description'],
+        'word_fields': ['description'],
+        'prefix_fields': ['name', 'sku'],
+        'fts_table': 'inventory_item_fts',
+        'weights': [10.0, 10.0, 1.0],
+    },
+}
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SqliteSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Returns the search backend matching the vendor of the default database connection.
+    """
+    try:
+        return SEARCH_BACKENDS[connection.vendor]()
+    except KeyError:
+        raise NotImplementedError(f"Search is not supported on {connection.vendor}.")
+
+
+def search(model, term, page=1, page_size=None):
+    """
+    Returns `(objects, has_next)` for one page of ranked search results of `model`.
+    """
+    page_size = page_size or getattr(settings, 'INVENTORY_PAGE_SIZE', 50)
+    offset = (page - 1) * page_size
+    ids = get_search_backend().search(model, term.strip(), offset, page_size + 1)
+    has_next = len(ids) > page_size
+    ids = ids[:page_size]
+
+    queryset = model.objects.all()
+    if model is Item:
+        queryset = queryset.select_related('category', 'created_by', 'updated_by')
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects], has_next
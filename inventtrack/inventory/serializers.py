@@ -1,12 +1,15 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.db import transaction
-from .models import Category, Item
+from django.utils import timezone
+from .models import Category, Item, StockMovement
 from authentication.models import User
 from common.log_utils import LoggerUtility
+from common.metrics import TimedSerializerMixin
 
 logger_utility = LoggerUtility()
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer class for the Category model.
     This serializer converts Category model instances into JSON format
@@ -16,7 +19,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ['id', 'name']
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer class for the Item model.
     """
@@ -45,6 +48,7 @@ class ItemSerializer(serializers.ModelSerializer):
         logger_utility.logger.info(f"Creating Item with data: {validated_data}")
         try:
             item = super().create(validated_data)
+            StockMovement.objects.record([(item.id, item.quantity, 'create', user)])
             logger_utility.logger.info(f"Item {item.id} created successfully by {user.email}")
         except Exception as e:
             logger_utility.log_error(f"Error creating Item: {str(e)}")
@@ -55,16 +59,262 @@ class ItemSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def update(self, instance, validated_data):
         """
-        Updates an existing Item instance with validated data.
+        Updates an existing Item instance with validated data. The row is locked first and the ledger
+        delta is taken from its current quantity, so a stock adjustment committed since `instance`
+        was read is neither lost from the quantity nor double counted in the ledger.
         """
         user = self.context['request'].user
         validated_data['updated_by'] = user
         logger_utility.logger.info(f"Updating Item {instance.id} with data: {validated_data}")
         try:
+            previous_quantity = Item.objects.select_for_update().values_list('quantity', flat=True).get(id=instance.id)
+            instance.quantity = previous_quantity
             item = super().update(instance, validated_data)
+            StockMovement.objects.record([(item.id, item.quantity - previous_quantity, 'update', user)])
             logger_utility.logger.info(f"Item {item.id} updated successfully by {user.email}")
         except Exception as e:
             logger_utility.log_error(f"Error updating Item {instance.id}: {str(e)}")
             raise e
         
         return item
+
+
+class ItemBulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer for bulk item operations. Validates every row, resolves foreign keys and
+    uniqueness with batched queries, and applies all rows and their stock movements in a single
+    transaction.
+    """
+    def get_chunk_size(self):
+        return getattr(settings, 'INVENTORY_BULK_CHUNK_SIZE', 1000)
+
+    def chunked(self, values):
+        values = list(values)
+        chunk_size = self.get_chunk_size()
+        for start in range(0, len(values), chunk_size):
+            yield values[start:start + chunk_size]
+
+    def to_internal_value(self, data):
+        """
+        Validates each row independently and collects errors per row instead of stopping at the first one.
+        """
+        if not isinstance(data, list):
+            raise serializers.ValidationError({"non_field_errors": ["Expected a list of items."]})
+        if not data:
+            raise serializers.ValidationError({"non_field_errors": ["At least one item is required."]})
+
+        rows, errors = [], []
+        for row in data:
+            try:
+                rows.append(self.child.run_validation(row))
+                errors.append({})
+            except serializers.ValidationError as e:
+                rows.append(None)
+                errors.append(e.detail)
+
+        self.validate_references(rows, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+    def validate_references(self, rows, errors):
+        """
+        Checks referenced categories, target items and unique fields with one query per chunk.
+        """
+        valid = [(index, row) for index, row in enumerate(rows) if row is not None]
+
+        category_ids = {row['category_id'] for _, row in valid if row.get('category_id') is not None}
+        existing_categories = set()
+        for chunk in self.chunked(category_ids):
+            existing_categories.update(Category.objects.filter(id__in=chunk).values_list('id', flat=True))
+
+        target_rows = {}
+        for _, row in valid:
+            if row['op'] != 'create':
+                target_rows[row['id']] = target_rows.get(row['id'], 0) + 1
+        target_ids = set(target_rows)
+        self.instances = {}
+        for chunk in self.chunked(target_ids):
+            self.instances.update(Item.objects.in_bulk(chunk))
+        deleted_ids = {row['id'] for _, row in valid if row['op'] == 'delete'}
+
+        owners = {'sku': {}, 'name': {}}
+        for field, owner in owners.items():
+            values = {row[field] for _, row in valid if row['op'] != 'delete' and field in row}
+            for chunk in self.chunked(values):
+                owner.update(Item.objects.filter(**{f'{field}__in': chunk}).values_list(field, 'id'))
+
+        seen = {'sku': set(), 'name': set()}
+        for index, row in valid:
+            row_errors = {}
+            if row.get('category_id') is not None and row['category_id'] not in existing_categories:
+                row_errors['category_id'] = [f"Category {row['category_id']} does not exist."]
+            if row['op'] != 'create' and row['id'] not in self.instances:
+                row_errors['id'] = [f"Item {row['id']} does not exist."]
+            elif row['op'] != 'create' and target_rows[row['id']] > 1:
+                row_errors['id'] = [f"Item {row['id']} appears in more than one row."]
+            if row['op'] != 'delete':
+                for field in ('sku', 'name'):
+                    if field not in row:
+                        continue
+                    owner_id = owners[field].get(row[field])
+                    if row[field] in seen[field] or (owner_id is not None and owner_id != row.get('id') and owner_id not in deleted_ids):
+                        row_errors[field] = [f"item with this {field} already exists."]
+                    seen[field].add(row[field])
+            if row_errors:
+                errors[index] = row_errors
+
+    def create(self, validated_data):
+        """
+        Applies deletes, updates and creates with batched SQL inside a single transaction. The
+        updated rows are locked in id order and their ledger deltas taken from the locked
+        quantities, so a stock adjustment committed since validation is not miscounted.
+        """
+        user = self.context['request'].user
+        now = timezone.now()
+        chunk_size = self.get_chunk_size()
+        deletes = [row['id'] for row in validated_data if row['op'] == 'delete']
+        updates = [row for row in validated_data if row['op'] == 'update']
+        creates = [row for row in validated_data if row['op'] == 'create']
+
+        logger_utility.logger.info(f"Bulk applying {len(creates)} creates, {len(updates)} updates, {len(deletes)} deletes")
+        with transaction.atomic():
+            for chunk in self.chunked(deletes):
+                Item.objects.filter(id__in=chunk).delete()
+
+            quantities = {}
+            for chunk in self.chunked(sorted(row['id'] for row in updates)):
+                quantities.update(Item.objects.select_for_update().filter(id__in=chunk).order_by('id').values_list('id', 'quantity'))
+            vanished = sorted(row['id'] for row in updates if row['id'] not in quantities)
+            if vanished:
+                raise serializers.ValidationError({"non_field_errors": [f"Items {vanished} no longer exist."]})
+
+            update_fields = {'updated_by', 'updated_at'}
+            instances = []
+            movements = []
+            for row in updates:
+                instance = self.instances[row['id']]
+                instance.quantity = quantities[instance.id]
+                if 'quantity' in row:
+                    movements.append((instance.id, row['quantity'] - instance.quantity, 'update', user))
+                for field, value in row.items():
+                    if field not in ('op', 'id'):
+                        setattr(instance, field, value)
+                        update_fields.add('category' if field == 'category_id' else field)
+                instance.updated_by = user
+                instance.updated_at = now
+                instances.append(instance)
+            if instances:
+                Item.objects.bulk_update(instances, sorted(update_fields), batch_size=chunk_size)
+
+            created = Item.objects.bulk_create(
+                [
+                    Item(**{field: value for field, value in row.items() if field != 'op'}, created_by=user, updated_by=user)
+                    for row in creates
+                ],
+                batch_size=chunk_size,
+            )
+            movements.extend((item.id, item.quantity, 'create', user) for item in created)
+            StockMovement.objects.record(movements)
+
+        return {
+            'created': [item.id for item in created],
+            'updated': [item.id for item in instances],
+            'deleted': deletes,
+        }
+
+
+class ItemBulkSerializer(serializers.Serializer):
+    """
+    Serializer for a single row of a bulk item request. `op` defaults to `update` when an id is
+    given and `create` otherwise.
+    """
+    op = serializers.ChoiceField(choices=['create', 'update', 'delete'], required=False)
+    id = serializers.IntegerField(required=False)
+    category_id = serializers.IntegerField(required=False, allow_null=True)
+    name = serializers.CharField(max_length=255, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    sku = serializers.CharField(max_length=100, required=False)
+    quantity = serializers.IntegerField(min_value=0, max_value=2147483647, required=False)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    class Meta:
+        list_serializer_class = ItemBulkListSerializer
+
+    def validate(self, attrs):
+        """
+        Checks that each operation carries the fields it needs.
+        """
+        op = attrs.setdefault('op', 'update' if 'id' in attrs else 'create')
+        if op == 'create':
+            attrs.pop('id', None)
+            missing = [field for field in ('name', 'sku', 'price') if field not in attrs]
+            if missing:
+                raise serializers.ValidationError({field: ["This field is required."] for field in missing})
+        elif 'id' not in attrs:
+            raise serializers.ValidationError({"id": ["This field is required."]})
+        if op == 'delete':
+            return {'op': op, 'id': attrs['id']}
+        return attrs
+
+
+class ItemImportRowSerializer(serializers.Serializer):
+    """
+    Serializer for one CSV row of an item import. The category is given by `category_id` or, when
+    that is missing, by `category` name. Foreign keys and uniqueness are checked per chunk by the importer.
+    """
+    sku = serializers.CharField(max_length=100)
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_null=True)
+    category_id = serializers.IntegerField(required=False, allow_null=True)
+    category = serializers.CharField(max_length=255, required=False)
+    quantity = serializers.IntegerField(min_value=0, max_value=2147483647)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    """
+    Serializer for a signed stock movement applied to an item's quantity.
+    """
+    id = serializers.IntegerField(required=False)
+    delta = serializers.IntegerField(min_value=-2147483647, max_value=2147483647)
+
+    def validate_delta(self, delta):
+        """
+        Rejects zero deltas, which would only rewrite the row.
+        """
+        if delta == 0:
+            raise serializers.ValidationError("delta must not be zero.")
+        return delta
+
+
+class ItemBatchGetSerializer(serializers.Serializer):
+    """
+    Serializer for a batch lookup of items by `ids` or by `skus`, exactly one of them, with at most
+    `INVENTORY_BATCH_GET_MAX_KEYS` keys.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False)
+    skus = serializers.ListField(child=serializers.CharField(max_length=100), required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        """
+        Checks that exactly one kind of key is given and that there are not too many of them.
+        """
+        if ('ids' in attrs) == ('skus' in attrs):
+            raise serializers.ValidationError("Provide either ids or skus.")
+        keys = attrs.get('ids') or attrs.get('skus')
+        max_keys = getattr(settings, 'INVENTORY_BATCH_GET_MAX_KEYS', 500)
+        if len(keys) > max_keys:
+            raise serializers.ValidationError(f"At most {max_keys} keys can be requested at once.")
+        return attrs
+
+
+class StockMovementSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer class for entries of the stock ledger.
+    """
+    created_by = serializers.SlugRelatedField(slug_field='email', read_only=True)
+
+    class Meta:
+        model = StockMovement
+        fields = ['id', 'item_id', 'delta', 'reason', 'created_by', 'created_at']
@@ -0,0 +1,65 @@
+"""
+Keeps cached items consistent with the category embedded in their representation.
+
+Renaming a category, or deleting it (which sets its items' category to NULL), changes the body of
+every item in it. The affected items are found through the indexed `category_id` column. Their
+`updated_at` is bumped in the same transaction, so item and listing validators change. Once the
+transaction commits, the entries of those items that are currently cached are re-rendered with one
+`get_many` and one `set_many` per chunk, leaving the rest of the cache untouched.
+
+Queryset `update()` and `bulk_update()` on categories do not send these signals.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from common.log_utils import LoggerUtility
+from .caching import item_cache, refresh_items
+from .models import Category, Item
+
+logger_utility = LoggerUtility()
+
+
+def refresh_cached_items(item_ids):
+    """
+    Re-renders the cached entries among `item_ids`, in chunks of `INVENTORY_BULK_CHUNK_SIZE`.
+    """
+    chunk_size = getattr(settings, 'INVENTORY_BULK_CHUNK_SIZE', 1000)
+    refreshed = 0
+    for start in range(0, len(item_ids), chunk_size):
+        cached = list(item_cache.get_many(item_ids[start:start + chunk_size]))
+        if cached:
+            refresh_items(cached)
+            refreshed += len(cached)
+    logger_utility.logger.info(f"Refreshed {refreshed} of {len(item_ids)} cached items after a category change")
+
+
+def category_changed(category_id):
+    """
+    Bumps the items of a category and schedules their cache refresh for after the commit.
+    """
+    items = Item.objects.filter(category_id=category_id)
+    item_ids = list(items.values_list('id', flat=True))
+    if item_ids:
+        items.update(updated_at=timezone.now())
+        transaction.on_commit(lambda: refresh_cached_items(item_ids))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_name(sender, instance, **kwargs):
+    instance._saved_name = (
+        Category.objects.filter(pk=instance.pk).values_list('name', flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    if not created and instance.name != getattr(instance, '_saved_name', instance.name):
+        category_changed(instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # Runs before SET_NULL detaches the items, while they can still be found by category.
+    category_changed(instance.pk)
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+from django.utils import timezone
+from .models import Item, StockMovement
+from .caching import item_cache
+from common.log_utils import LoggerUtility
+
+logger_utility = LoggerUtility()
+
+class StockAdjustmentError(Exception):
+    """
+    Raised when a stock adjustment references missing items or would make a quantity negative.
+    """
+    def __init__(self, missing, insufficient):
+        self.missing = missing
+        self.insufficient = insufficient
+        super().__init__(f"Stock adjustment rejected. Missing: {missing}, insufficient stock: {insufficient}")
+
+
+class _RollbackAdjustment(Exception):
+    pass
+
+
+def adjust_stock(deltas, user):
+    """
+    Applies `{item_id: delta}` as a single guarded `quantity = quantity + delta` UPDATE and
+    appends the movements to the stock ledger. Either every item is adjusted or none is; the
+    new quantities are returned. The cached item entries are evicted once the change commits, so
+    the next read renders them, `updated_by` included, from the database.
+    """
+    whens = []
+    guard = Q()
+    for pk, delta in deltas.items():
+        whens.append(When(id=pk, then=F('quantity') + delta))
+        guard |= Q(id=pk, quantity__gte=-delta) if delta < 0 else Q(id=pk)
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            updated = Item.objects.filter(guard).update(
+                quantity=Case(*whens, default=F('quantity'), output_field=PositiveIntegerField()),
+                updated_by=user,
+                updated_at=now,
+            )
+            if updated != len(deltas):
+                raise _RollbackAdjustment()
+            StockMovement.objects.record((pk, delta, 'adjustment', user) for pk, delta in deltas.items())
+            quantities = dict(Item.objects.filter(id__in=deltas).values_list('id', 'quantity'))
+    except _RollbackAdjustment:
+        current = dict(Item.objects.filter(id__in=deltas).values_list('id', 'quantity'))
+        missing = sorted(pk for pk in deltas if pk not in current)
+        insufficient = sorted(pk for pk in current if current[pk] + deltas[pk] < 0)
+        logger_utility.log_error(f"Stock adjustment rejected. Missing: {missing}, insufficient: {insufficient}")
+        raise StockAdjustmentError(missing, insufficient)
+
+    transaction.on_commit(lambda: item_cache.delete_many(list(quantities)))
+    logger_utility.logger.info(f"Adjusted stock for {len(quantities)} items")
+    return quantities
@@ -0,0 +1,1062 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.urls import include, path
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from authentication.models import User
+from common.cache_helpers import NOT_FOUND, ReadThroughCache
+from common.db_router import PrimaryReplicaRouter, ReplicaStickinessMiddleware, lag_monitor, use_primary
+from common.jwt_helpers import (
+    HasTokenPermissions, PermissionsAssigning, StatelessJWTAuthentication, TokenClaimsCache, UserActivityCache,
+    token_claims_cache, user_activity_cache,
+)
+from common.local_cache import LocalLRUCache, RedisInvalidationBus, get_invalidation_bus, get_local_cache
+from common.log_utils import BackgroundQueueHandler, JsonFormatter, LazyPayload, LoggerUtility
+from common.metrics import REGISTRY
+from common.pagination import KeysetPaginator
+from common.query_budget import QueryBudget, QueryBudgetExceeded, QueryBudgetMiddleware
+from . import async_views, urls
+from .caching import build_entry, item_cache
+from .export import export_watermark
+from .fast_serializers import CategoryFastSerializer, ItemFastSerializer, dumps
+from .stock import adjust_stock
+from .models import Category, Item, ItemImportRow, StockMovement
+from .search import search
+from .serializers import CategorySerializer, ItemBulkSerializer, ItemSerializer
+
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+class AsyncURLConf:
+    """
+    The inventory routes as inventory/urls.py builds them when INVENTORY_ASYNC_VIEWS is on.
+    """
+    urlpatterns = [
+        path('inventory/', include([
+            path('categories/', async_views.AsyncCategoryListing.as_view(), name='list-categories'),
+            path('item/<int:pk>/', async_views.AsyncItemConfiguration.as_view(), name='get-update-delete-item'),
+            path('item/<int:pk>/stock/', async_views.AsyncStockAdjustment.as_view(), name='item-stock'),
+            path('items/', async_views.AsyncItemListing.as_view(), name='list-items'),
+            path('items/stock/', async_views.AsyncStockAdjustment.as_view(http_method_names=['post']), name='adjust-items-stock'),
+        ] + urls.urlpatterns)),
+    ]
+
+
+@override_settings(CACHES=TEST_CACHES, INVENTORY_ENFORCE_QUERY_BUDGETS=True)
+class InventoryAPITestCase(TestCase):
+    """
+    Base test case with a superuser, a few categories and items, and an authenticated client.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin@example.com', 'Admin', password='Pass@1234')
+        cls.categories = [Category.objects.create(name=f'Category {i}') for i in range(3)]
+        cls.items = [
+            Item.objects.create(
+                name=f'Item {i}', sku=f'SKU-{i:03}', quantity=i, price='9.50', description=f'Item number {i}',
+                category=cls.categories[i % 3], created_by=cls.user, updated_by=cls.user,
+            )
+            for i in range(30)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        get_local_cache().clear()
+        token = PermissionsAssigning().get_token(self.user).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+
+class StatelessAuthenticationTests(InventoryAPITestCase):
+    """
+    Safe requests authenticate from the token claims alone, honour deactivation once the activity
+    cache entry is gone, and unsafe requests load the real user.
+    """
+    def setUp(self):
+        super().setUp()
+        user_activity_cache.clear()
+        self.authorization = self.client.defaults['HTTP_AUTHORIZATION']
+
+    def authenticate(self, method):
+        request = getattr(RequestFactory(), method)('/inventory/items/', HTTP_AUTHORIZATION=self.authorization)
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def test_safe_requests_use_a_token_user(self):
+        self.authenticate('get')
+        with self.assertNumQueries(0):
+            user, token = self.authenticate('get')
+        self.assertIsInstance(user, TokenUser)
+        self.assertEqual((user.id, token['email']), (self.user.id, self.user.email))
+
+    def test_unsafe_requests_load_the_user(self):
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate('post')
+        self.assertIsInstance(user, User)
+        self.assertEqual(user, self.user)
+
+    def test_deactivated_user_is_rejected_once_the_activity_entry_expires(self):
+        self.authenticate('get')
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertIsInstance(self.authenticate('get')[0], TokenUser)
+
+        expired = time.monotonic() + user_activity_cache.ttl + 1
+        with mock.patch('common.jwt_helpers.time.monotonic', return_value=expired):
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate('get')
+
+        user_activity_cache.clear()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate('get')
+
+    def test_activity_cache_evicts_least_recently_used(self):
+        activity = UserActivityCache(ttl=60, max_size=2)
+        for user_id in (1, 2):
+            activity.set(user_id, True)
+        activity.get(1)
+        activity.set(3, False)
+        self.assertEqual([activity.get(user_id) for user_id in (1, 2, 3)], [True, None, False])
+
+
+class TokenClaimsTests(InventoryAPITestCase):
+    """
+    Validated tokens are cached until their `exp` claim, and views require the token's permissions claim.
+    """
+    def setUp(self):
+        super().setUp()
+        token_claims_cache.clear()
+
+    def make_token(self, user=None):
+        token = PermissionsAssigning().get_token(user or self.user).access_token
+        return str(token).encode(), token
+
+    def test_cached_tokens_skip_validation(self):
+        raw_token, _ = self.make_token()
+        request = RequestFactory().get('/inventory/items/', HTTP_AUTHORIZATION=f'Bearer {raw_token.decode()}')
+        validate_token = JWTAuthentication.get_validated_token
+        with mock.patch.object(JWTAuthentication, 'get_validated_token', autospec=True, side_effect=validate_token) as validate:
+            StatelessJWTAuthentication().authenticate(request)
+            StatelessJWTAuthentication().authenticate(request)
+        validate.assert_called_once()
+        self.assertIsNotNone(token_claims_cache.get(raw_token))
+
+    def test_entries_expire_at_the_token_exp(self):
+        claims = TokenClaimsCache(max_size=10)
+        raw_token, token = self.make_token()
+        claims.set(raw_token, token)
+        self.assertIs(claims.get(raw_token), token)
+        header, payload, signature = raw_token.split(b'.')
+        self.assertIsNone(claims.get(b'.'.join([header, payload + b'x', signature])))
+
+        with mock.patch('common.jwt_helpers.time.time', return_value=token['exp']):
+            self.assertIsNone(claims.get(raw_token))
+        self.assertIsNone(claims.get(raw_token))
+
+    def test_size_is_bounded(self):
+        claims = TokenClaimsCache(max_size=2)
+        tokens = [self.make_token(User.objects.create_user(f'user{i}@example.com', f'User {i}', password='Pass@1234')) for i in range(3)]
+        for raw_token, token in tokens:
+            claims.set(raw_token, token)
+        self.assertEqual([claims.get(raw_token) is not None for raw_token, _ in tokens], [False, True, True])
+
+    def test_missing_permission_claim_is_denied(self):
+        member = User.objects.create_user('member@example.com', 'Member', password='Pass@1234')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.make_token(member)[0].decode()}'
+        self.assertEqual(self.client.get('/inventory/items/').status_code, 200)
+        response = self.client.post('/inventory/item/', {'name': 'New', 'sku': 'NEW-1', 'price': '1.00'}, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+        view = mock.Mock(required_permissions={'GET': ['view_item'], 'DELETE': ['delete_item']})
+        permission = HasTokenPermissions()
+        self.assertTrue(permission.has_permission(mock.Mock(method='HEAD', auth={'permissions': ['view_item']}), view))
+        self.assertFalse(permission.has_permission(mock.Mock(method='DELETE', auth={'permissions': ['view_item']}), view))
+        self.assertFalse(permission.has_permission(mock.Mock(method='GET', auth={}), view))
+
+
+class QueryBudgetTests(InventoryAPITestCase):
+    """
+    Read endpoints stay within their declared query budgets, and list endpoints issue the same
+    number of queries whatever the page size.
+    """
+    def count_queries(self, path):
+        cache.clear()
+        get_local_cache().clear()
+        user_activity_cache.clear()
+        with QueryBudget() as counter:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return counter.count
+
+    def test_item_detail_within_budget(self):
+        self.assertEqual(self.client.get(f'/inventory/item/{self.items[0].id}/').status_code, 200)
+
+    def test_item_listing_does_not_grow_with_page_size(self):
+        self.assertEqual(
+            self.count_queries('/inventory/items/?page_size=2'),
+            self.count_queries('/inventory/items/?page_size=30'),
+        )
+
+    def test_category_listing_does_not_grow_with_page_size(self):
+        self.assertEqual(
+            self.count_queries('/inventory/categories/?page_size=1'),
+            self.count_queries('/inventory/categories/?page_size=3'),
+        )
+
+    def test_item_search_does_not_grow_with_results(self):
+        self.assertEqual(
+            self.count_queries('/inventory/items/search/?q=SKU-001'),
+            self.count_queries('/inventory/items/search/?q=Item&page_size=30'),
+        )
+
+    def test_item_update_within_budget(self):
+        item = self.items[0]
+        response = self.client.put(
+            f'/inventory/item/{item.id}/',
+            {'name': item.name, 'sku': item.sku, 'quantity': 5, 'price': '9.50', 'category_id': item.category_id},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(INVENTORY_ENFORCE_QUERY_BUDGETS=True)
+    def test_middleware_fails_reads_and_logs_writes(self):
+        item = self.items[0]
+        with mock.patch.object(QueryBudgetMiddleware, 'get_budget', return_value=0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/inventory/items/')
+            response = self.client.post(f'/inventory/item/{item.id}/stock/', {'delta': 1}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_budget_exceeded_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with QueryBudget(1):
+                list(Item.objects.all())
+                list(Category.objects.all())
+
+
+class KeysetPaginationTests(InventoryAPITestCase):
+    """
+    Cursor pages cover every row exactly once, and the seek predicate starts with an index range bound.
+    """
+    def test_pages_cover_all_items_with_ties(self):
+        Item.objects.filter(id__in=[item.id for item in self.items[:10]]).update(updated_at=timezone.now())
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/inventory/items/', {'page_size': 7, **({'cursor': cursor} if cursor else {})})
+            seen += [result['id'] for result in response.json()['results']]
+            cursor = response.json()['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(item.id for item in self.items))
+
+    def test_seek_filter_has_leading_bound(self):
+        paginator = KeysetPaginator(('-updated_at', '-id'))
+        sql = str(Item.objects.filter(paginator.seek_filter([timezone.now(), 5])).query)
+        self.assertIn('"updated_at" <=', sql)
+
+
+class SearchTests(InventoryAPITestCase):
+    """
+    Terms shorter than a trigram match a case-sensitive prefix of the item name or SKU.
+    """
+    def test_short_terms_match_prefixes(self):
+        items, has_next = search(Item, 'SK', page_size=50)
+        self.assertEqual([item.id for item in items], [item.id for item in self.items])
+        self.assertFalse(has_next)
+        self.assertEqual(search(Item, 'sk')[0], [])
+        self.assertEqual(search(Item, 'It', page_size=5)[1], True)
+
+
+class CategoryListingTests(InventoryAPITestCase):
+    """
+    Categories are paged with keyset cursors, can be streamed as NDJSON, one object per line, and
+    searched through the search backend.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.categories += [Category.objects.create(name=f'Extra {i}') for i in range(10)]
+        # Every row shares one updated_at, so only the id tie-breaker orders the pages.
+        Category.objects.update(updated_at=timezone.now())
+
+    def test_cursor_pages_neither_repeat_nor_skip(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            response = self.client.get('/inventory/categories/', {'page_size': 4, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            seen += [category['id'] for category in response.json()['results']]
+            cursor, pages = response.json()['next_cursor'], pages + 1
+            if not cursor:
+                break
+        self.assertEqual(seen, sorted(category.id for category in self.categories))
+        self.assertEqual(pages, 4)
+
+        response = self.client.get('/inventory/categories/', {'page_size': 4, 'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_ndjson_stream(self):
+        response = self.client.get('/inventory/categories/', {'stream': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], CategorySerializer(Category.objects.order_by('id'), many=True).data)
+
+    def test_search_uses_the_search_backend(self):
+        response = self.client.get('/inventory/categories/', {'search': 'Extra', 'page_size': 4})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((len(data['results']), data['page'], data['has_next']), (4, 1, True))
+        self.assertTrue(all(category['name'].startswith('Extra') for category in data['results']))
+        with mock.patch('inventory.search.search', wraps=search) as backend:
+            self.client.get('/inventory/categories/', {'search': 'Ex'})
+        backend.assert_called_once()
+        self.assertEqual(self.client.get('/inventory/categories/', {'search': 'Extra', 'page_size': 100000}).json()['has_next'], False)
+
+
+class FastSerializerParityTests(InventoryAPITestCase):
+    """
+    The fast read serializers produce byte-identical JSON to the DRF serializers and renderer.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other = User.objects.create_user('émile@example.com', 'Émile', password='Pass@1234')
+        cls.items += [
+            Item.objects.create(name='Ünïcödé \u2028 "quoted" \\ item', sku='UNI-1', price='0.10', description=None,
+                                category=None, created_by=other, updated_by=None),
+            Item.objects.create(name='Tab\tand\nnewline \x01', sku='CTRL-1', quantity=7, price='12345678.90',
+                                description='\u2029 emoji \U0001F600 line\u2028separator', category=cls.categories[1]),
+        ]
+
+    def assertRendersLikeDRF(self, fast_data, drf_data):
+        self.assertEqual(dumps(fast_data), JSONRenderer().render(drf_data))
+
+    def test_item_parity(self):
+        queryset = Item.objects.order_by('id')
+        self.assertRendersLikeDRF(ItemFastSerializer().data(queryset), ItemSerializer(queryset, many=True).data)
+        for item in queryset:
+            self.assertRendersLikeDRF(ItemFastSerializer().data(Item.objects.filter(id=item.id))[0], ItemSerializer(item).data)
+
+    def test_category_parity(self):
+        queryset = Category.objects.order_by('id')
+        self.assertRendersLikeDRF(CategoryFastSerializer().data(queryset), CategorySerializer(queryset, many=True).data)
+
+    def test_stdlib_encoder_parity(self):
+        queryset = Item.objects.order_by('id')
+        with mock.patch('common.renderers.orjson', None):
+            self.assertRendersLikeDRF(ItemFastSerializer().data(queryset), ItemSerializer(queryset, many=True).data)
+
+    def test_cached_item_body_matches_serializer(self):
+        for item in Item.objects.all():
+            response = self.client.get(f'/inventory/item/{item.id}/')
+            self.assertEqual(response.content, JSONRenderer().render(ItemSerializer(item).data))
+
+
+class MetricsTests(InventoryAPITestCase):
+    """
+    Requests are recorded per URL name and report their query and cache counts in Server-Timing.
+    """
+    @override_settings(METRICS_SERVER_TIMING=True)
+    def test_server_timing_reports_queries_and_cache(self):
+        path = f'/inventory/item/{self.items[0].id}/'
+        self.client.get(path)
+        timing = self.client.get(path)['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="0 queries"', timing)
+        self.assertIn('desc="1 hits, 0 misses"', timing)
+
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_endpoint(self):
+        self.client.get('/inventory/items/')
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE inventtrack_request_duration_seconds histogram', body)
+        self.assertIn('inventtrack_request_duration_seconds_count{view="list-items",method="GET"}', body)
+
+    def test_metrics_are_refused_to_other_clients(self):
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='203.0.113.7').status_code, 403)
+        with self.settings(METRICS_ALLOWED_IPS=['203.0.113.7']):
+            self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='203.0.113.7').status_code, 200)
+            self.assertEqual(self.client.get('/metrics/').status_code, 403)
+
+    def test_pool_metrics(self):
+        stats = {'default': {'pool_size': 4, 'pool_available': 3, 'requests_num': 12, 'requests_wait_ms': 250}}
+        with mock.patch('common.metrics.pool_stats', return_value=stats):
+            body = self.client.get('/metrics/').content.decode()
+        self.assertIn('inventtrack_db_pool_size{database="default"} 4', body)
+        self.assertIn('inventtrack_db_pool_wait_seconds_total{database="default"} 0.25', body)
+        self.assertIn('# TYPE inventtrack_db_pool_requests_total counter', body)
+
+
+class LoggingTests(TestCase):
+    """
+    Bodies are attached to log records lazily and for a sample of requests, and the background
+    handler drops and counts records instead of blocking when its queue is full.
+    """
+    def test_payload_is_rendered_and_truncated_when_formatted(self):
+        rendered = []
+
+        class Body:
+            def __str__(self):
+                rendered.append(self)
+                return 'x' * 100
+
+        payload = {'body': Body()}
+        request = RequestFactory().post('/inventory/item/')
+        request.data = payload
+        with self.settings(LOG_BODY_SAMPLE_RATE=1.0, LOG_BODY_MAX_CHARS=20):
+            with self.assertLogs('common.log_utils', 'INFO') as logs:
+                LoggerUtility().log_request(request, 'Incoming request')
+        self.assertEqual(rendered, [])
+
+        entry = json.loads(JsonFormatter().format(logs.records[0]))
+        self.assertEqual(len(rendered), 1)
+        self.assertEqual(entry['http']['data'], f"{json.dumps({'body': 'x' * 100})[:20]}... (112 chars)")
+
+    def test_bodies_are_sampled_except_errors(self):
+        logger_utility = LoggerUtility()
+        request = RequestFactory().get('/inventory/items/')
+        with self.settings(LOG_BODY_SAMPLE_RATE=0.5), mock.patch('common.log_utils.random.random', return_value=0.7):
+            with self.assertLogs('common.log_utils', 'INFO') as logs:
+                logger_utility.log_request(request, 'Incoming request')
+                logger_utility.log_response(mock.Mock(status_code=200, data={}), 'Response')
+                logger_utility.log_response(mock.Mock(status_code=400, data={'name': ['required']}), 'Response')
+        self.assertEqual(['data' in record.http for record in logs.records], [False, False, True])
+        self.assertIsInstance(logs.records[2].http['data'], LazyPayload)
+
+    def test_full_queue_drops_and_counts_records(self):
+        handler = BackgroundQueueHandler([{'class': 'logging.NullHandler'}], queue_size=1)
+        handler.set_name('test-queue')
+        handler.stop()
+        record = logging.makeLogRecord({'msg': 'queued'})
+        for _ in range(3):
+            handler.enqueue(record)
+        self.assertEqual(handler.dropped, 2)
+        self.assertIn('inventtrack_log_records_dropped_total{handler="test-queue"} 2', REGISTRY.render())
+
+
+class ConditionalGetTests(InventoryAPITestCase):
+    """
+    Item and list reads answer 304 when the client's validators are current, for the identity and
+    the gzip ETag alike.
+    """
+    def test_item_if_none_match(self):
+        path = f'/inventory/item/{self.items[0].id}/'
+        etag = self.client.get(path)['ETag']
+        for if_none_match in (etag, etag[:-1] + '-gzip"', f'"other", {etag}', '*'):
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=if_none_match)
+            self.assertEqual(response.status_code, 304, if_none_match)
+            self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'{path}stock/', {'delta': 1}, content_type='application/json')
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_uncached_item_conditional_get(self):
+        path = f'/inventory/item/{self.items[0].id}/'
+        etag, last_modified = self.client.get(path)['ETag'], self.client.get(path)['Last-Modified']
+        stale = http_date((self.items[0].updated_at - timedelta(seconds=5)).timestamp())
+        for headers, status_code in [
+            ({'HTTP_IF_NONE_MATCH': '"other"'}, 200),
+            ({'HTTP_IF_MODIFIED_SINCE': stale}, 200),
+            ({'HTTP_IF_NONE_MATCH': etag}, 304),
+            ({'HTTP_IF_MODIFIED_SINCE': last_modified}, 304),
+        ]:
+            cache.clear()
+            get_local_cache().clear()
+            self.assertEqual(self.client.get(path, **headers).status_code, status_code, headers)
+
+    def test_item_if_modified_since(self):
+        path = f'/inventory/item/{self.items[0].id}/'
+        last_modified = self.client.get(path)['Last-Modified']
+        self.assertEqual(self.client.get(path, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        earlier = http_date((self.items[0].updated_at - timedelta(seconds=5)).timestamp())
+        self.assertEqual(self.client.get(path, HTTP_IF_MODIFIED_SINCE=earlier).status_code, 200)
+        # If-None-Match takes precedence over If-Modified-Since.
+        response = self.client.get(path, HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(INVENTORY_CACHE_COMPRESS_MIN_BYTES=10)
+    def test_compressed_entries_are_passed_through(self):
+        item = self.items[0]
+        path = f'/inventory/item/{item.id}/'
+        expected = JSONRenderer().render(ItemSerializer(item).data)
+        plain = self.client.get(path)
+        compressed = self.client.get(path, HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), expected)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.content, expected)
+        for response in (plain, compressed):
+            self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(compressed['ETag'], plain['ETag'][:-1] + '-gzip"')
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=compressed['ETag']).status_code, 304)
+
+    def test_listing_validators(self):
+        path = '/inventory/items/?page_size=5'
+        response = self.client.get(path)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag[:-1] + '-gzip"').status_code, 304)
+        self.assertEqual(self.client.get(path, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self.client.get('/inventory/items/?page_size=6', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CategoryInvalidationTests(InventoryAPITestCase):
+    """
+    Renaming or deleting a category refreshes the cached items embedding it and changes their ETags.
+    """
+    def test_rename_refreshes_cached_items(self):
+        item = self.items[0]
+        path = f'/inventory/item/{item.id}/'
+        etag = self.client.get(path)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/inventory/category/{item.category_id}/', {'name': 'Renamed'}, content_type='application/json')
+
+        response = self.client.get(path)
+        self.assertEqual(response.json()['category'], {'id': item.category_id, 'name': 'Renamed'})
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delete_detaches_cached_items(self):
+        item = self.items[0]
+        self.client.get(f'/inventory/item/{item.id}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/inventory/category/{item.category_id}/')
+        self.assertIsNone(self.client.get(f'/inventory/item/{item.id}/').json()['category'])
+
+
+class CacheWarmupTests(InventoryAPITestCase):
+    """
+    Item reads are counted, and warming writes the most read items first.
+    """
+    @override_settings(READ_THROUGH_CACHE={'ACCESS_FLUSH_INTERVAL': 0})
+    def test_hot_items_are_warmed(self):
+        hot = self.items[3].id
+        # Drop reads counted by earlier tests that were never flushed.
+        item_cache.access.counts.clear()
+        self.client.get(f'/inventory/item/{hot}/')
+        self.assertEqual(item_cache.hottest(), [hot])
+
+        cache.delete(item_cache.key(hot))
+        get_local_cache().clear()
+        call_command('warm_item_cache', '--hot-only', stdout=io.StringIO())
+        self.assertEqual(list(item_cache.get_many([item.id for item in self.items])), [hot])
+
+        call_command('warm_item_cache', '--batch-size', '7', stdout=io.StringIO())
+        self.assertEqual(len(item_cache.get_many([item.id for item in self.items])), len(self.items))
+
+    def test_warming_keeps_existing_entries(self):
+        item = self.items[2]
+        fresh = build_entry({'id': item.id, 'quantity': 999}, item.updated_at)
+        item_cache.set(item.id, fresh)
+        call_command('warm_item_cache', '--batch-size', '4', stdout=io.StringIO())
+        self.assertEqual(item_cache.get(item.id), fresh)
+        self.assertEqual(len(item_cache.get_many([item.id for item in self.items])), len(self.items))
+
+    def test_redis_adds_are_pipelined(self):
+        redis_cache = {'default': {'BACKEND': 'django_redis.cache.RedisCache', 'LOCATION': 'redis://localhost:6379/0'}}
+        connection = mock.Mock()
+        connection.pipeline.return_value.execute.return_value = [True, None, True]
+        with self.settings(CACHES=redis_cache), mock.patch('django_redis.get_redis_connection', return_value=connection):
+            added = item_cache.add_many({1: 'one', 2: 'two', 3: 'three'})
+        self.assertEqual(added, 2)
+        pipeline = connection.pipeline.return_value
+        self.assertEqual(pipeline.set.call_count, 3)
+        self.assertTrue(all(call.kwargs['nx'] for call in pipeline.set.call_args_list))
+        pipeline.execute.assert_called_once()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReadThroughCacheTests(TestCase):
+    """
+    Misses are loaded by the single caller holding the key's lock, and unknown ids are cached briefly.
+    """
+    def setUp(self):
+        cache.clear()
+        self.cache = ReadThroughCache('test', local=False)
+
+    def test_only_the_lock_holder_loads(self):
+        loader = mock.Mock(return_value={'id': 1})
+        self.assertEqual(self.cache.get_or_load(1, loader), {'id': 1})
+        self.assertEqual(self.cache.get_or_load(1, loader), {'id': 1})
+        loader.assert_called_once()
+        self.assertIsNone(cache.get(f"{self.cache.key(1)}:lock"))
+
+        # Another caller holds the lock and stores the entry while this one polls.
+        cache.add(f"{self.cache.key(2)}:lock", 1)
+
+        def holder_finishes(seconds):
+            self.cache.set(2, {'id': 2})
+
+        with mock.patch('common.cache_helpers.time.sleep', side_effect=holder_finishes) as sleep:
+            self.assertEqual(self.cache.get_or_load(2, loader), {'id': 2})
+        sleep.assert_called_once()
+        loader.assert_called_once()
+
+    @override_settings(READ_THROUGH_CACHE={'LOCK_WAIT': 0})
+    def test_waiter_loads_itself_when_the_holder_is_too_slow(self):
+        cache.add(f"{self.cache.key(3)}:lock", 1)
+        loader = mock.Mock(return_value={'id': 3})
+        self.assertEqual(self.cache.get_or_load(3, loader), {'id': 3})
+        self.assertIsNone(self.cache.get(3))
+
+    def test_unknown_ids_are_negatively_cached(self):
+        loader = mock.Mock(return_value=None)
+        self.assertIsNone(self.cache.get_or_load(4, loader))
+        self.assertIsNone(self.cache.get_or_load(4, loader))
+        loader.assert_called_once()
+        self.assertEqual(self.cache.get(4), NOT_FOUND)
+
+        with mock.patch('common.cache_helpers.cache.set', wraps=cache.set) as cache_set:
+            self.cache.get_or_load(5, loader)
+        cache_set.assert_called_once_with(self.cache.key(5), NOT_FOUND, 30)
+
+    def test_unknown_item_detail_is_served_from_the_cache(self):
+        user = User.objects.create_superuser('admin@example.com', 'Admin', password='Pass@1234')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {PermissionsAssigning().get_token(user).access_token}'
+        self.assertEqual(self.client.get('/inventory/item/999999/').status_code, 404)
+        self.assertEqual(item_cache.get(999999), NOT_FOUND)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/inventory/item/999999/').status_code, 404)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LocalCacheTests(TestCase):
+    """
+    The per-process LRU refuses writes that raced an invalidation, stays within its byte budget,
+    and drops entries invalidated by other workers.
+    """
+    def setUp(self):
+        cache.clear()
+        get_local_cache().clear()
+
+    def test_stale_epoch_writes_are_refused(self):
+        local_cache = LocalLRUCache(max_bytes=1024, timeout=30)
+        epoch = local_cache.epoch
+        local_cache.invalidate(['v1:item:1'])
+        local_cache.set('v1:item:1', b'stale', epoch)
+        self.assertIsNone(local_cache.get('v1:item:1'))
+
+        local_cache.set('v1:item:1', b'fresh', local_cache.epoch)
+        self.assertEqual(local_cache.get('v1:item:1'), b'fresh')
+
+    def test_least_recently_used_entries_are_evicted(self):
+        local_cache = LocalLRUCache(max_bytes=10, timeout=30)
+        for key in ('a', 'b'):
+            local_cache.set(key, b'1234', local_cache.epoch)
+        local_cache.get('a')
+        local_cache.set('c', b'1234', local_cache.epoch)
+        self.assertEqual([local_cache.get(key) for key in ('a', 'b', 'c')], [b'1234', None, b'1234'])
+        self.assertEqual(local_cache.size, 8)
+        local_cache.set('d', b'x' * 11, local_cache.epoch)
+        self.assertIsNone(local_cache.get('d'))
+
+    def test_invalidations_from_other_workers_drop_local_entries(self):
+        read_through = ReadThroughCache('test', local=True)
+        read_through.set(1, 'old')
+        self.assertEqual(read_through.get(1), 'old')
+
+        # Another worker writes the shared cache and publishes the key.
+        cache.set(read_through.key(1), 'new')
+        self.assertEqual(read_through.get(1), 'old')
+        get_invalidation_bus().publish([read_through.key(1)])
+        self.assertEqual(read_through.get(1), 'new')
+
+    def test_listener_disconnect_clears_local_caches(self):
+        class Disconnected(Exception):
+            pass
+
+        def messages():
+            yield {'data': json.dumps(['v1:item:1'])}
+            raise ConnectionError('connection lost')
+
+        pubsub = mock.Mock(listen=mock.Mock(return_value=messages()))
+        bus = RedisInvalidationBus(channel='test')
+        bus.get_connection = mock.Mock(return_value=mock.Mock(pubsub=mock.Mock(return_value=pubsub)))
+        received = []
+        bus.subscribers.append(received.append)
+        # Stop the reconnect loop at its first back-off.
+        with mock.patch('common.local_cache.time.sleep', side_effect=Disconnected):
+            with self.assertRaises(Disconnected):
+                bus.listen()
+        self.assertEqual(received, [['v1:item:1'], None])
+
+
+class ItemBulkTests(InventoryAPITestCase):
+    """
+    Bulk requests report errors per row and apply either every row or none.
+    """
+    def post_bulk(self, rows):
+        return self.client.post('/inventory/items/bulk/', rows, content_type='application/json')
+
+    def test_errors_are_reported_per_row(self):
+        response = self.post_bulk([
+            {'id': self.items[0].id, 'quantity': 50},
+            {'name': 'Duplicate', 'sku': self.items[1].sku, 'price': '1.00'},
+            {'id': 999999, 'op': 'delete'},
+            {'op': 'create', 'name': 'No price', 'sku': 'NEW-1'},
+            {'id': self.items[2].id, 'op': 'delete'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = {error['row']: error['errors'] for error in response.json()['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertIn('sku', errors[1])
+        self.assertIn('id', errors[2])
+        self.assertIn('price', errors[3])
+        self.assertEqual(Item.objects.get(id=self.items[0].id).quantity, 0)
+        self.assertTrue(Item.objects.filter(id=self.items[2].id).exists())
+
+    def test_rows_are_applied_in_one_transaction(self):
+        rows = [
+            {'id': self.items[0].id, 'quantity': 50},
+            {'name': 'New item', 'sku': 'NEW-1', 'price': '1.00', 'quantity': 3},
+            {'id': self.items[2].id, 'op': 'delete'},
+        ]
+        with mock.patch.object(StockMovement.objects, 'record', side_effect=RuntimeError('ledger unavailable')):
+            with self.assertRaises(RuntimeError):
+                self.post_bulk(rows)
+        self.assertEqual(Item.objects.get(id=self.items[0].id).quantity, 0)
+        self.assertFalse(Item.objects.filter(sku='NEW-1').exists())
+        self.assertTrue(Item.objects.filter(id=self.items[2].id).exists())
+
+        response = self.post_bulk(rows)
+        self.assertEqual(response.json(), {'created': 1, 'updated': 1, 'deleted': 1})
+        self.assertEqual(Item.objects.get(id=self.items[0].id).quantity, 50)
+        self.assertEqual(StockMovement.objects.get(item__sku='NEW-1').delta, 3)
+
+    def test_overlapping_ids_are_rejected(self):
+        item = self.items[0]
+        response = self.post_bulk([{'id': item.id, 'quantity': 5}, {'id': item.id, 'op': 'delete'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['row'] for error in response.json()['errors']], [0, 1])
+        self.assertTrue(Item.objects.filter(id=item.id).exists())
+
+    def test_deltas_are_taken_from_locked_rows(self):
+        item = self.items[6]
+        request = RequestFactory().post('/')
+        request.user = self.user
+        serializer = ItemBulkSerializer(data=[{'id': item.id, 'quantity': 50}], many=True, context={'request': request})
+        self.assertTrue(serializer.is_valid())
+        adjust_stock({item.id: 10}, self.user)
+        serializer.save()
+        self.assertEqual(StockMovement.objects.filter(item=item, reason='update').get().delta, 50 - (item.quantity + 10))
+        self.assertEqual(Item.objects.get(id=item.id).quantity, 50)
+
+
+class StockAdjustmentTests(InventoryAPITestCase):
+    """
+    Stock adjustments are guarded against negative stock and evict the adjusted items from the cache.
+    """
+    def test_adjustment_evicts_cached_item(self):
+        item = self.items[3]
+        self.client.get(f'/inventory/item/{item.id}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/inventory/item/{item.id}/stock/', {'delta': 7}, content_type='application/json')
+        self.assertEqual(response.json(), {'id': item.id, 'quantity': item.quantity + 7})
+        self.assertIsNone(item_cache.get(item.id))
+        self.assertEqual(self.client.get(f'/inventory/item/{item.id}/').json()['quantity'], item.quantity + 7)
+
+    def test_decrement_below_zero_is_rejected(self):
+        item = self.items[3]
+        response = self.client.post(f'/inventory/item/{item.id}/stock/', {'delta': -4}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['insufficient'], [item.id])
+        self.assertEqual(Item.objects.get(id=item.id).quantity, 3)
+
+        response = self.client.post(f'/inventory/item/{item.id}/stock/', {'delta': -3}, content_type='application/json')
+        self.assertEqual(response.json(), {'id': item.id, 'quantity': 0})
+
+    def test_batch_adjustment_is_all_or_nothing(self):
+        plenty, scarce = self.items[10], self.items[1]
+        adjustments = [{'id': plenty.id, 'delta': -5}, {'id': scarce.id, 'delta': -2}]
+        response = self.client.post('/inventory/items/stock/', adjustments, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['insufficient'], [scarce.id])
+        self.assertEqual(Item.objects.get(id=plenty.id).quantity, 10)
+        self.assertFalse(StockMovement.objects.exists())
+
+        response = self.client.post('/inventory/items/stock/', [{'id': plenty.id, 'delta': -5}, {'id': 999999, 'delta': 1}], content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['missing'], [999999])
+        self.assertEqual(Item.objects.get(id=plenty.id).quantity, 10)
+
+
+class StockLedgerTests(InventoryAPITestCase):
+    """
+    The stock ledger stays consistent with item quantities.
+    """
+    def test_update_records_delta_from_locked_quantity(self):
+        item = self.items[4]
+        stale = Item.objects.get(id=item.id)
+        adjust_stock({item.id: 10}, self.user)
+        serializer = ItemSerializer(stale, data={
+            'name': item.name, 'sku': item.sku, 'quantity': 50, 'price': '9.50', 'category_id': item.category_id,
+        }, context={'request': RequestFactory().put('/')})
+        serializer.context['request'].user = self.user
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertEqual(StockMovement.objects.filter(item=item, reason='update').get().delta, 50 - (item.quantity + 10))
+
+    def test_item_created_empty_has_stock_history(self):
+        response = self.client.post('/inventory/item/', {
+            'name': 'Empty', 'sku': 'EMPTY-1', 'quantity': 0, 'price': '1.00', 'category_id': self.categories[0].id,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        stock = self.client.get(f"/inventory/item/{response.json()['id']}/stock/")
+        self.assertEqual(stock.status_code, 200)
+        self.assertEqual(stock.json()['quantity'], 0)
+
+    def test_quantity_as_of_survives_compaction(self):
+        item = self.items[5]
+        now = timezone.now()
+        StockMovement.objects.bulk_create([
+            StockMovement(item=item, delta=delta, reason=reason, created_at=now - timedelta(days=days))
+            for delta, reason, days in [(5, 'create', 40), (3, 'adjustment', 35), (-2, 'adjustment', 10), (4, 'update', 1)]
+        ])
+
+        def quantities(*days_ago):
+            return [StockMovement.objects.quantity_as_of(item.id, now - timedelta(days=days)) for days in days_ago]
+
+        self.assertEqual(quantities(36, 20, 5, 2, 0), [5, 8, 6, 6, 10])
+        call_command('compact_stock_ledger', '--older-than-days', '30', stdout=io.StringIO())
+        self.assertEqual(StockMovement.objects.filter(item=item).count(), 2)
+        self.assertEqual(quantities(36, 20, 5, 2, 0), [None, 8, 6, 6, 10])
+
+        # Movements before the new cutoff are folded into its snapshot; earlier snapshots are kept.
+        call_command('compact_stock_ledger', '--older-than-days', '3', stdout=io.StringIO())
+        self.assertEqual(StockMovement.objects.filter(item=item).count(), 1)
+        self.assertEqual(quantities(20, 2, 0), [8, 6, 10])
+
+
+class ItemExportTests(InventoryAPITestCase):
+    """
+    Exports stream every item as CSV or NDJSON, and only items changed since a watermark when given one.
+    """
+    def export(self, path, **extra):
+        response = self.client.get(path, **extra)
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content)
+        return response, gzip.decompress(body) if response.get('Content-Encoding') == 'gzip' else body
+
+    @override_settings(INVENTORY_EXPORT_CHUNK_SIZE=7, INVENTORY_EXPORT_WATERMARK_LAG=0)
+    def test_full_and_incremental_export(self):
+        response, body = self.export('/inventory/items/export/')
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual([row['sku'] for row in rows], [item.sku for item in self.items])
+        self.assertEqual(rows[1]['category'], 'Category 1')
+
+        watermark = response['X-Export-Watermark']
+        Item.objects.filter(id=self.items[5].id).update(updated_at=timezone.now() + timedelta(seconds=1))
+        response, body = self.export('/inventory/items/export/', data={'since': watermark, 'output': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual([json.loads(line)['id'] for line in body.splitlines()], [self.items[5].id])
+
+    @override_settings(INVENTORY_EXPORT_WATERMARK_LAG=30)
+    def test_watermark_trails_the_oldest_open_transaction(self):
+        now = timezone.now()
+        with mock.patch('inventory.export.oldest_open_transaction', return_value=now - timedelta(minutes=10)):
+            self.assertEqual(export_watermark(), now - timedelta(minutes=10, seconds=30))
+        with mock.patch('inventory.export.oldest_open_transaction', return_value=None):
+            self.assertGreaterEqual(export_watermark(), now - timedelta(seconds=30))
+
+    async def test_asgi_export_streams_asynchronously(self):
+        headers = {'Authorization': self.client.defaults['HTTP_AUTHORIZATION']}
+        response = await AsyncClient().get('/inventory/items/export/', {'output': 'ndjson'}, headers=headers)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), len(self.items))
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf)
+class AsyncViewTests(InventoryAPITestCase):
+    """
+    The native async views authenticate like the DRF views and answer with the same bodies.
+    """
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+        self.headers = {'Authorization': self.client.defaults['HTTP_AUTHORIZATION']}
+
+    async def get_both(self, path, data=None):
+        response = await self.async_client.get(path, data, headers=self.headers)
+        with self.settings(ROOT_URLCONF='inventtrack.urls'):
+            expected = await sync_to_async(self.client.get)(path, data)
+        self.assertEqual(response.status_code, expected.status_code)
+        return response, expected
+
+    async def test_reads_match_the_sync_views(self):
+        item_path = f'/inventory/item/{self.items[2].id}/'
+        for path, data in [(item_path, None), ('/inventory/categories/', None), ('/inventory/items/', {'page_size': 7, 'min_quantity': 3})]:
+            response, expected = await self.get_both(path, data)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), expected.json(), path)
+            self.assertEqual(response['ETag'], expected['ETag'])
+
+        etag = (await self.get_both(item_path))[0]['ETag']
+        response = await self.async_client.get(item_path, headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_authentication_and_permissions(self):
+        response = await self.async_client.get(f'/inventory/item/{self.items[0].id}/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        response = await self.async_client.get('/inventory/items/', headers={'Authorization': 'Bearer not-a-token'})
+        self.assertEqual(response.status_code, 401)
+
+        member = await sync_to_async(User.objects.create_user)('member@example.com', 'Member', password='Pass@1234')
+        token = PermissionsAssigning().get_token(member).access_token
+        response = await self.async_client.post(
+            f'/inventory/item/{self.items[0].id}/stock/', {'delta': 1}, content_type='application/json',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    async def test_unknown_items_are_not_found(self):
+        response, expected = await self.get_both('/inventory/item/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), expected.json())
+        response = await self.async_client.post('/inventory/item/999999/stock/', {'delta': 1}, content_type='application/json', headers=self.headers)
+        self.assertEqual((response.status_code, response.json()['missing']), (404, [999999]))
+
+    async def test_stock_adjustments(self):
+        item = self.items[3]
+        response = await self.async_client.post(f'/inventory/item/{item.id}/stock/', {'delta': 2}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.json(), {'id': item.id, 'quantity': 5})
+        response = await self.async_client.post(
+            '/inventory/items/stock/', [{'id': item.id, 'delta': -6}], content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual((response.status_code, response.json()['insufficient']), (409, [item.id]))
+        response = await self.async_client.post(
+            '/inventory/items/stock/', [{'id': item.id, 'delta': -5}], content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.json(), {'results': [{'id': item.id, 'quantity': 0}]})
+        self.assertEqual(await StockMovement.objects.filter(item=item).acount(), 2)
+
+
+class ItemImportTests(InventoryAPITestCase):
+    """
+    CSV imports upsert items by SKU through the staging table, record stock movements and reject bad rows.
+    """
+    csv_data = (
+        "sku,name,description,category,quantity,price\n"
+        "SKU-001,Item 1,Restocked,Category 2,40,9.50\n"
+        "SKU-002,Item 2,Item number 2,Category 2,2,9.50\n"
+        "NEW-001,New item,,Category 0,5,3.25\n"
+        "NEW-005,Empty item,,,0,2.00\n"
+        "NEW-002,Item 3,,,1,1.00\n"
+        "NEW-003,Other,,Missing,1,1.00\n"
+        "NEW-004,Negative,,,-1,1.00\n"
+    )
+
+    def test_upload_upserts_by_sku(self):
+        self.client.get(f'/inventory/item/{self.items[1].id}/')
+        upload = SimpleUploadedFile('items.csv', self.csv_data.encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/inventory/items/import/', {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual({key: data[key] for key in ('created', 'updated', 'unchanged', 'rejected')}, {'created': 2, 'updated': 1, 'unchanged': 1, 'rejected': 3})
+        self.assertEqual([reject['line'] for reject in sorted(data['rejects'], key=lambda reject: reject['line'])], [6, 7, 8])
+
+        updated = Item.objects.get(sku='SKU-001')
+        self.assertEqual((updated.quantity, updated.description, updated.category_id), (40, 'Restocked', self.categories[2].id))
+        self.assertEqual(self.client.get(f'/inventory/item/{updated.id}/').json()['quantity'], 40)
+        created = Item.objects.get(sku='NEW-001')
+        self.assertEqual(StockMovement.objects.filter(item=created, reason='create').get().delta, 5)
+        self.assertEqual(StockMovement.objects.filter(item=updated, reason='update').get().delta, 39)
+        self.assertEqual(StockMovement.objects.filter(item__sku='NEW-005', reason='create').get().delta, 0)
+        self.assertFalse(ItemImportRow.objects.exists())
+
+    def test_command_writes_rejects(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path, rejects = os.path.join(directory, 'items.csv'), os.path.join(directory, 'rejects.csv')
+            with open(path, 'w') as source:
+                source.write(self.csv_data)
+            call_command('import_items', path, '--user', self.user.email, '--rejects', rejects, '--chunk-size', '2', stdout=io.StringIO())
+            with open(rejects) as rejected:
+                errors = {row['sku']: json.loads(row['errors']) for row in csv.DictReader(rejected)}
+        self.assertEqual(sorted(errors), ['NEW-002', 'NEW-003', 'NEW-004'])
+        self.assertIn('name', errors['NEW-002'])
+        self.assertEqual(Item.objects.get(sku='SKU-001').quantity, 40)
+
+
+class ItemBatchGetTests(InventoryAPITestCase):
+    """
+    Batch lookups answer in request order, load only cache misses and mark unknown keys.
+    """
+    def test_ids_in_request_order_with_misses_loaded_once(self):
+        first, second = self.items[4].id, self.items[9].id
+        self.client.get(f'/inventory/item/{first}/')
+        with self.assertNumQueries(2):
+            response = self.client.post('/inventory/items/batch-get/', {'ids': [second, 999999, first, second]}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['id'] for result in results], [second, 999999, first, second])
+        self.assertEqual(results[1], {'id': 999999, 'not_found': True})
+        self.assertEqual(len(item_cache.get_many([first, second])), 2)
+        with self.assertNumQueries(1):
+            repeated = self.client.post('/inventory/items/batch-get/', {'ids': [999999, first]}, content_type='application/json')
+        self.assertEqual(repeated.json()['results'][0], {'id': 999999, 'not_found': True})
+
+    def test_skus_and_validation(self):
+        response = self.client.post('/inventory/items/batch-get/', {'skus': ['SKU-002', 'NOPE']}, content_type='application/json')
+        self.assertEqual(response.json()['results'][0]['sku'], 'SKU-002')
+        self.assertEqual(response.json()['results'][1], {'sku': 'NOPE', 'not_found': True})
+
+        both = self.client.post('/inventory/items/batch-get/', {'ids': [1], 'skus': ['SKU-002']}, content_type='application/json')
+        self.assertEqual(both.status_code, 400)
+        with self.settings(INVENTORY_BATCH_GET_MAX_KEYS=2):
+            too_many = self.client.post('/inventory/items/batch-get/', {'ids': [1, 2, 3]}, content_type='application/json')
+        self.assertEqual(too_many.status_code, 400)
+
+
+@override_settings(DATABASE_REPLICATION={'REPLICAS': ['replica'], 'STICKY_SECONDS': 5, 'MAX_LAG_SECONDS': 5})
+class ReplicaRoutingTests(TestCase):
+    """
+    Reads go to healthy replicas unless pinned to the primary; writes always go to the primary.
+    """
+    def setUp(self):
+        lag_monitor.reset()
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_use_replica_and_writes_use_primary(self):
+        with mock.patch('common.db_router.measure_lag', return_value=0.0):
+            self.assertEqual(self.router.db_for_read(Item), 'replica')
+        self.assertEqual(self.router.db_for_write(Item), 'default')
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Item), 'default')
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        with mock.patch('common.db_router.measure_lag', return_value=30.0):
+            self.assertEqual(self.router.db_for_read(Item), 'default')
+
+    def test_writes_make_reads_sticky(self):
+        middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse(status=201))
+        response = middleware(RequestFactory().post('/inventory/item/'))
+        until = response['X-Read-Primary-Until']
+        self.assertEqual(response.cookies['read_primary_until'].value, until)
+
+        factory = RequestFactory()
+        self.assertTrue(middleware.needs_primary(factory.get('/inventory/items/', headers={'X-Read-Primary-Until': until})))
+        factory.cookies['read_primary_until'] = until
+        self.assertTrue(middleware.needs_primary(factory.get('/inventory/items/')))
+        self.assertFalse(middleware.needs_primary(RequestFactory().get('/inventory/items/')))
+        self.assertFalse(middleware.needs_primary(RequestFactory().get('/inventory/items/', headers={'X-Read-Primary-Until': '9999999999'})))
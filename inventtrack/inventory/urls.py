@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -9,19 +10,55 @@ Category Routes:
     - POST /category/ : Creates a new category.
     - PUT /category/<int:pk>/ : Updates an existing category.
     - DELETE /category/<int:pk>/ : Deletes an existing category.
-    - GET /categories/ : Retrieves a list of all categories or searches by name.
+    - GET /categories/ : Retrieves a cursor-paginated list of categories (`?stream=ndjson` streams all rows, `?search=` ranks name matches).
+    - GET /categories/search/?q=<term> : Ranked, paginated search over category names.
 
 Item Routes:
     - POST /item/ : Creates a new item.
     - GET /item/<int:pk>/ : Retrieves an item by its primary key.
     - PUT /item/<int:pk>/ : Updates an existing item.
     - DELETE /item/<int:pk>/ : Deletes an existing item.
+    - POST /item/<int:pk>/stock/ : Atomically increments or decrements an item's quantity by `delta`.
+    - GET /item/<int:pk>/stock/?as_of=<datetime> : Returns an item's quantity at a point in time from the stock ledger.
+    - GET /item/<int:pk>/movements/ : Lists an item's stock movements, newest first, with cursor pagination.
+    - GET /items/ : Lists items with cursor pagination, filtered by category, SKU prefix, quantity and price.
+    - POST /items/bulk/ : Creates, updates and deletes many items from a JSON array or NDJSON body in one transaction.
+    - POST /items/import/ : Creates or updates items by SKU from an uploaded CSV file (multipart field `file`).
+    - GET /items/export/?output=csv|ndjson&since=<watermark> : Streams all items, or those changed since a watermark.
+    - POST /items/batch-get/ : Retrieves many items by id or SKU in request order, marking keys that match no item.
+    - POST /items/stock/ : Atomically applies a list of `{id, delta}` stock adjustments in one UPDATE.
+    - GET /items/search/?q=<term> : Ranked, paginated search over item names, SKUs and descriptions.
+
+When `INVENTORY_ASYNC_VIEWS` is on (the default under ASGI), GET /categories/, GET /item/<int:pk>/,
+GET /items/ and the stock adjustment POSTs are served by the native async views in `async_views`.
 """
 
 urlpatterns = [
     path('category/', views.CategoryConfiguration.as_view(http_method_names=['post']), name='create-category'),
     path('category/<int:pk>/', views.CategoryConfiguration.as_view(http_method_names=['put', 'delete']), name='update-delete-category'),
     path('categories/', views.CategoryConfiguration.as_view(http_method_names=['get']), name='list-categories'),
+    path('categories/search/', views.CategorySearch.as_view(), name='search-categories'),
     path('item/', views.ItemConfiguration.as_view(http_method_names=['post']), name='create-item'),
     path('item/<int:pk>/', views.ItemConfiguration.as_view(http_method_names=['get', 'put', 'delete']), name='get-update-delete-item'),
+    path('item/<int:pk>/stock/', views.StockAdjustment.as_view(), name='item-stock'),
+    path('item/<int:pk>/movements/', views.StockMovementListing.as_view(), name='list-item-movements'),
+    path('items/', views.ItemListing.as_view(), name='list-items'),
+    path('items/bulk/', views.ItemBulkConfiguration.as_view(), name='bulk-items'),
+    path('items/import/', views.ItemImport.as_view(), name='import-items'),
+    path('items/export/', views.ItemExport.as_view(), name='export-items'),
+    path('items/batch-get/', views.ItemBatchGet.as_view(), name='batch-get-items'),
+    path('items/stock/', views.StockAdjustment.as_view(http_method_names=['post']), name='adjust-items-stock'),
+    path('items/search/', views.ItemSearch.as_view(), name='search-items'),
 ]
+
+if settings.INVENTORY_ASYNC_VIEWS:
+    from . import async_views
+
+    # Matched before the sync routes above; methods they do not implement fall through to the sync views.
+    urlpatterns = [
+        path('categories/', async_views.AsyncCategoryListing.as_view(), name='list-categories'),
+        path('item/<int:pk>/', async_views.AsyncItemConfiguration.as_view(), name='get-update-delete-item'),
+        path('item/<int:pk>/stock/', async_views.AsyncStockAdjustment.as_view(), name='item-stock'),
+        path('items/', async_views.AsyncItemListing.as_view(), name='list-items'),
+        path('items/stock/', async_views.AsyncStockAdjustment.as_view(http_method_names=['post']), name='adjust-items-stock'),
+    ] + urlpatterns
@@ -3,22 +3,83 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
-from django.core.cache import cache
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.exceptions import ValidationError
+import io
 import json
-from .serializers import CategorySerializer, ItemSerializer
-from .models import Category, Item
-from common.jwt_helpers import check_permissions
+from rest_framework.parsers import JSONParser, MultiPartParser
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.dateparse import parse_datetime
+from .serializers import CategorySerializer, ItemSerializer, ItemBulkSerializer, ItemBatchGetSerializer, StockAdjustmentSerializer, StockMovementSerializer
+from .stock import adjust_stock, StockAdjustmentError
+from .fast_serializers import CategoryFastSerializer, ItemFastSerializer
+from common.renderers import dumps
+from .imports import ItemImportError, ItemImporter
+from .export import FORMATS as EXPORT_FORMATS, ItemExporter, async_chunks, export_watermark
+from .caching import item_cache, load_item, refresh_items, get_or_load_items, build_entry, entry_body, entry_response
+from common.conditional import is_not_modified, not_modified, rows_etag, set_validators
+from .models import Category, Item, StockMovement
+from common.jwt_helpers import HasTokenPermissions
 from common.log_utils import LoggerUtility
+from common.pagination import KeysetPaginator, InvalidCursor
+from common.parsers import NDJSONParser
+from . import search
 
 logger_utility = LoggerUtility()
 
-class CategoryConfiguration(APIView):
+class SearchMixin:
+    """
+    Shared handling of ranked, page-numbered search results for a model. Search pages with OFFSET
+    on purpose: results are ordered by rank, which has no stable keyset to seek from, and ranked
+    searches are read a few pages deep at most.
+    """
+    def get_search_page_size(self, request):
+        """
+        Reads the `page_size` query parameter and clamps it to `INVENTORY_MAX_PAGE_SIZE`.
+        """
+        default = getattr(settings, 'INVENTORY_PAGE_SIZE', 50)
+        try:
+            page_size = int(request.query_params.get('page_size', default))
+        except ValueError:
+            return default
+        return max(1, min(page_size, getattr(settings, 'INVENTORY_MAX_PAGE_SIZE', 500)))
+
+    def search_response(self, request, model, serializer_class, term=None):
+        """
+        Runs the search term (`q` unless given) against `model` and returns one page of ranked results.
+        """
+        term = (term if term is not None else request.query_params.get('q', '')).strip()
+        if not term:
+            logger_utility.log_error("Search term is required.")
+            return Response({"message": "The q parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page = max(1, int(request.query_params.get('page', 1)))
+        except ValueError:
+            return Response({"message": "page must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        page_size = self.get_search_page_size(request)
+        results, has_next = search.search(model, term, page=page, page_size=page_size)
+        serializer = serializer_class(results, many=True)
+        data = {"results": serializer.data, "page": page, "has_next": has_next}
+        logger_utility.log_response(Response(data), f"{len(results)} {model._meta.verbose_name_plural} matched '{term}'")
+        return Response(data, status=status.HTTP_200_OK)
+
+class CategoryConfiguration(SearchMixin, APIView):
     """
     API view for managing Category operations (create, update, retrieve, delete).
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'POST': ["create_category"],
+        'PUT': ["update_category"],
+        'GET': ["view_category"],
+        'DELETE': ["delete_category"],
+    }
+    query_budget = {'GET': 3}
 
-    @check_permissions(["create_category"])
     def post(self, request):
         """
         Creates a new category with the provided data.
@@ -33,7 +94,6 @@ class CategoryConfiguration(APIView):
         logger_utility.log_error(f"Failed to create category: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @check_permissions(["update_category"])
     def put(self, request, pk):
         """
         Updates an existing category identified by its primary key (pk).
@@ -54,24 +114,48 @@ class CategoryConfiguration(APIView):
         logger_utility.log_error(f"Failed to update category {pk}: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @check_permissions(["view_category"])
     def get(self, request):
         """
-        Retrieves a list of all categories or searches by name.
+        Retrieves a page of categories, optionally streaming all of them as NDJSON. With `?search=`,
+        returns a page of ranked name matches from the search backend instead, like /categories/search/.
         """
         logger_utility.log_request(request, "GET /categories")
-        search_term = request.query_params.get('search', None)
-        
+        search_term = request.query_params.get('search', '').strip()
         if search_term:
-            categories = Category.objects.filter(name__icontains=search_term)
-        else:
-            categories = Category.objects.all()
+            return self.search_response(request, Category, CategorySerializer, term=search_term)
+
+        categories = Category.objects.all()
+        if request.query_params.get('stream') in ('1', 'true', 'ndjson'):
+            logger_utility.logger.info("Streaming categories as NDJSON")
+            return StreamingHttpResponse(self.stream_ndjson(categories), content_type='application/x-ndjson')
+
+        paginator = KeysetPaginator(('id',))
+        try:
+            categories, next_cursor = paginator.paginate(categories.only('id', 'name', 'updated_at'), request)
+        except InvalidCursor as e:
+            logger_utility.log_error(f"Invalid category cursor: {e}")
+            return Response({"message": "Invalid query parameters.", "detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag, last_modified = rows_etag(categories, next_cursor)
+        if is_not_modified(request, etag, last_modified):
+            logger_utility.logger.info("Categories not modified")
+            return not_modified(etag, last_modified)
+
         serializer = CategorySerializer(categories, many=True)
+        data = {"results": serializer.data, "next_cursor": next_cursor}
+
+        logger_utility.log_response(Response(data), "Categories retrieved successfully")      
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, last_modified)
 
-        logger_utility.log_response(Response(serializer.data), "Categories retrieved successfully")      
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def stream_ndjson(self, categories):
+        """
+        Yields one JSON line per category, reading rows from the database in fixed-size chunks.
+        """
+        chunk_size = getattr(settings, 'INVENTORY_STREAM_CHUNK_SIZE', 2000)
+        serializer = CategoryFastSerializer()
+        for row in serializer.rows(categories.order_by('id')).iterator(chunk_size=chunk_size):
+            yield dumps(serializer.to_representation(row)) + b"\n"
     
-    @check_permissions(["delete_category"])
     def delete(self, request, pk):
         """
         Deletes a category identified by its primary key (pk).
@@ -91,9 +175,15 @@ class ItemConfiguration(APIView):
     """
     API view for managing Item operations (create, update, retrieve, delete).
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'POST': ["create_item"],
+        'PUT': ["update_item"],
+        'DELETE': ["delete_item"],
+        'GET': ["view_item"],
+    }
+    query_budget = {'GET': 2, 'POST': 6, 'PUT': 8}
 
-    @check_permissions(["create_item"])
     def post(self, request):
         """
         Creates a new item with the provided data and caches it.
@@ -103,22 +193,20 @@ class ItemConfiguration(APIView):
         if serializer.is_valid():
             serializer.save()
             item_id = serializer.data['id']
-            cache_key = f'item_{item_id}'
-            cache.set(cache_key, json.dumps(serializer.data))
+            item_cache.set(item_id, build_entry(serializer.data, serializer.instance.updated_at))
 
             logger_utility.log_response(Response(serializer.data), f"Item {item_id} created and cached successfully")
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         logger_utility.log_error(f"Failed to create item: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @check_permissions(["update_item"])
     def put(self, request, pk):
         """
         Updates an existing item identified by its primary key (pk) and refreshes the cache.
         """
         logger_utility.log_request(request, f"PUT /item-update/{pk}")
         try:
-            item = Item.objects.get(id=pk)
+            item = Item.objects.select_related('category', 'created_by', 'updated_by').get(id=pk)
         except Item.DoesNotExist:
             logger_utility.log_error(f"Item {pk} not found.")
             return Response({"message":"Item not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -126,16 +214,13 @@ class ItemConfiguration(APIView):
         serializer = ItemSerializer(item, data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
-            cache_key = f'item_{pk}'
-            cache.delete(cache_key)
-            cache.set(cache_key, json.dumps(serializer.data))
+            item_cache.set(pk, build_entry(serializer.data, serializer.instance.updated_at))
             
             logger_utility.log_response(Response(serializer.data), f"Item {pk} updated and cache refreshed successfully")
             return Response(serializer.data, status=status.HTTP_200_OK)
         logger_utility.log_error(f"Failed to update item {pk}: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @check_permissions(["delete_item"])
     def delete(self, request, pk):
         """
         Deletes an item identified by its primary key (pk) and clears it from cache.
@@ -149,30 +234,405 @@ class ItemConfiguration(APIView):
 
         with transaction.atomic():
             item.delete()
-            cache_key = f'item_{pk}'
-            cache.delete(cache_key)
+            item_cache.delete(pk)
             logger_utility.log_response(Response({"message": "Item deleted successfully."}), f"Item {pk} deleted and cache cleared")
         return Response({"message": "Item deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
     
-    @check_permissions(["view_item"])
     def get(self, request, pk):
         """
-        Retrieves an item by its primary key (pk) from cache or database.
+        Retrieves an item by its primary key (pk) through the read-through item cache, returning the
+        pre-rendered response body as is, or a 304 when the client's validators match the entry's.
+        A cache miss loads the full entry once and answers the conditional request from it.
         """
         logger_utility.log_request(request, f"GET /item/{pk}")
-        cache_key = f'item_{pk}'
-        cached_item = cache.get(cache_key)
-        if cached_item:
-            logger_utility.log_response(Response(json.loads(cached_item)), f"Item {pk} retrieved from cache")
-            return Response(json.loads(cached_item), status=status.HTTP_200_OK)
-        
-        try:
-            item = Item.objects.get(id=pk)
-        except Item.DoesNotExist:
+        entry = item_cache.get_or_load(pk, lambda: load_item(pk))
+        if entry is None:
             logger_utility.log_error(f"Item {pk} not found.")
             return Response({"message":"Item not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        serializer = ItemSerializer(item)
-        cache.set(cache_key, json.dumps(serializer.data))
-        logger_utility.log_response(Response(serializer.data), f"Item {pk} retrieved from DB and cached")
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        if is_not_modified(request, entry.etag, entry.last_modified):
+            logger_utility.logger.info(f"Item {pk} not modified")
+            return not_modified(entry.etag, entry.last_modified)
+
+        logger_utility.logger.info(f"Item {pk} served from the cached response ({len(entry.body)} bytes, encoding: {entry.encoding})")
+        return entry_response(entry, request)
+
+class ItemFilterMixin:
+    """
+    Orderings and filters of the item listing, shared by the sync and async views.
+    """
+    orderings = {
+        'updated_at': ('updated_at', 'id'),
+        '-updated_at': ('-updated_at', '-id'),
+    }
+    range_filters = {
+        'min_quantity': 'quantity__gte',
+        'max_quantity': 'quantity__lte',
+        'min_price': 'price__gte',
+        'max_price': 'price__lte',
+    }
+
+    def filter_queryset(self, request):
+        """
+        Applies the category, SKU prefix, quantity range and price range filters.
+        """
+        queryset = Item.objects.all()
+        params = request.GET
+
+        category_id = params.get('category_id')
+        if category_id:
+            queryset = queryset.filter(category_id=category_id)
+        sku = params.get('sku')
+        if sku:
+            queryset = queryset.filter(sku__startswith=sku)
+        for param, lookup in self.range_filters.items():
+            value = params.get(param)
+            if value not in (None, ''):
+                field = Item._meta.get_field(lookup.split('__')[0])
+                queryset = queryset.filter(**{lookup: field.to_python(value)})
+        return queryset
+
+class ItemListing(ItemFilterMixin, APIView):
+    """
+    API view for listing items with keyset pagination, filtering and ordering.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'GET': ["view_item"],
+    }
+    query_budget = {'GET': 3}
+
+    def get(self, request):
+        """
+        Retrieves a page of items ordered by (updated_at, id) starting after the given cursor. The page
+        is first resolved to `(id, updated_at)` pairs from the keyset index, which decide the ETag and
+        a possible 304 before the full rows are loaded and serialized.
+        """
+        logger_utility.log_request(request, "GET /items")
+        ordering = request.query_params.get('ordering', 'updated_at')
+        if ordering not in self.orderings:
+            logger_utility.log_error(f"Invalid item ordering: {ordering}")
+            return Response({"message": f"ordering must be one of {list(self.orderings)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPaginator(self.orderings[ordering])
+        try:
+            versions, next_cursor = paginator.paginate(self.filter_queryset(request).only('id', 'updated_at'), request)
+        except (InvalidCursor, ValidationError, ValueError) as e:
+            logger_utility.log_error(f"Invalid item listing parameters: {e}")
+            return Response({"message": "Invalid query parameters.", "detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag, last_modified = rows_etag(versions, next_cursor)
+        if is_not_modified(request, etag, last_modified):
+            logger_utility.logger.info("Items not modified")
+            return not_modified(etag, last_modified)
+
+        items = ItemFastSerializer().data_by_id([row.id for row in versions])
+        data = {"results": [items[row.id] for row in versions if row.id in items], "next_cursor": next_cursor}
+        logger_utility.log_response(Response(data), f"{len(versions)} items listed")
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, last_modified)
+
+class ItemExport(APIView):
+    """
+    API view for exporting all items, or those changed since a watermark, as a CSV or NDJSON stream.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'GET': ["view_item"],
+    }
+
+    def get(self, request):
+        """
+        Streams the items selected by `?since=<watermark>` in the `?output=csv|ndjson` format (CSV by
+        default), gzip-compressed for clients that accept it. The watermark to pass as `since` next
+        time is returned in the `X-Export-Watermark` header. Under ASGI the rows are streamed through
+        an async iterator, so the export is never buffered in memory.
+        """
+        logger_utility.log_request(request, "GET /items/export")
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            logger_utility.log_error(f"Invalid export format: {output}")
+            return Response({"message": f"output must be one of {list(EXPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        since = request.query_params.get('since')
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                return Response({"message": "since must be an ISO 8601 datetime."}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        watermark = export_watermark()
+        compress = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        exporter = ItemExporter(output)
+        chunks = exporter.stream(since or None, compress=compress)
+        if isinstance(request._request, ASGIRequest):
+            chunks = async_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=exporter.content_type)
+        response['Content-Disposition'] = f'attachment; filename="items.{output}"'
+        response['X-Export-Watermark'] = watermark.isoformat()
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        logger_utility.logger.info(f"Streaming items as {output}{' (gzip)' if compress else ''} since {since.isoformat() if since else 'the beginning'}")
+        return response
+
+class ItemImport(APIView):
+    """
+    API view for importing items from an uploaded CSV file, keyed on SKU.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'POST': ["create_item", "update_item"],
+    }
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        """
+        Imports the CSV uploaded as `file` through the staging table and a single upsert. Responds
+        with the row counts and the first rejected rows with their errors.
+        """
+        logger_utility.logger.info(f"POST /items/import | User: {request.user.id}")
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"file": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = ItemImporter(request.user)
+        try:
+            counts = importer.run(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+        except (ItemImportError, UnicodeDecodeError) as e:
+            logger_utility.log_error(f"Item import rejected: {e}")
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {**counts, "rejects": importer.reported}
+        logger_utility.log_response(Response(data), "Item import applied")
+        return Response(data, status=status.HTTP_200_OK)
+
+class ItemBatchGet(APIView):
+    """
+    API view for fetching many items by id or SKU in one request.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'POST': ["view_item"],
+    }
+    query_budget = {'POST': 3}
+
+    def post(self, request):
+        """
+        Returns the requested items in request order. Cached entries are read with one `get_many`,
+        the misses are loaded with one query and written back with one `set_many`, and the cached
+        bodies are joined as is. Keys matching no item answer `{"id"|"sku": key, "not_found": true}`.
+        """
+        logger_utility.log_request(request, "POST /items/batch-get")
+        serializer = ItemBatchGetSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger_utility.log_error(f"Batch item request rejected: {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if 'ids' in serializer.validated_data:
+            key_field, keys = 'id', serializer.validated_data['ids']
+            ids_by_key = {key: key for key in keys}
+        else:
+            key_field, keys = 'sku', serializer.validated_data['skus']
+            ids_by_key = dict(Item.objects.filter(sku__in=set(keys)).values_list('sku', 'id'))
+
+        entries = get_or_load_items(list(set(ids_by_key.values())))
+        results = []
+        for key in keys:
+            entry = entries.get(ids_by_key.get(key))
+            results.append(entry_body(entry) if entry is not None else dumps({key_field: key, "not_found": True}))
+        found = sum(1 for key in keys if ids_by_key.get(key) in entries)
+        logger_utility.logger.info(f"Batch item request served {found} of {len(keys)} keys")
+        return HttpResponse(b'{"results":[' + b','.join(results) + b']}', content_type='application/json')
+
+class ItemBulkConfiguration(APIView):
+    """
+    API view for creating, updating and deleting many items in one request.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'POST': ["create_item", "update_item", "delete_item"],
+    }
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        """
+        Validates a JSON array or NDJSON body of item rows and applies them in a single transaction,
+        then refreshes the affected cache entries in batches.
+        """
+        row_count = len(request.data) if isinstance(request.data, list) else 0
+        logger_utility.logger.info(f"POST /items/bulk | User: {request.user.id} | Rows: {row_count}")
+        serializer = ItemBulkSerializer(data=request.data, many=True, context={'request': request})
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, dict):
+                logger_utility.log_error(f"Bulk item request rejected: {errors}")
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            row_errors = [{"row": index, "errors": error} for index, error in enumerate(errors) if error]
+            logger_utility.log_error(f"Bulk item request rejected with {len(row_errors)} invalid rows")
+            return Response({"errors": row_errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = serializer.save()
+        self.refresh_cache(result, serializer.get_chunk_size())
+        data = {operation: len(ids) for operation, ids in result.items()}
+        logger_utility.log_response(Response(data), "Bulk item request applied")
+        return Response(data, status=status.HTTP_200_OK)
+
+    def refresh_cache(self, result, chunk_size):
+        """
+        Re-caches created and updated items with `set_many` and evicts deleted ones with `delete_many`.
+        """
+        changed_ids = result['created'] + result['updated']
+        for start in range(0, len(changed_ids), chunk_size):
+            refresh_items(changed_ids[start:start + chunk_size])
+        for start in range(0, len(result['deleted']), chunk_size):
+            item_cache.delete_many(result['deleted'][start:start + chunk_size])
+
+class StockAdjustmentMixin:
+    """
+    Request validation and result shaping for stock adjustments, shared by the sync and async views.
+    """
+    def get_deltas(self, data, pk=None):
+        """
+        Validates a single `{delta}` for item `pk`, or a list of `{id, delta}` adjustments, into
+        `({item_id: delta}, None)`, or returns `(None, errors)`.
+        """
+        if pk is not None:
+            serializer = StockAdjustmentSerializer(data=data)
+        else:
+            serializer = StockAdjustmentSerializer(data=data, many=True)
+        if not serializer.is_valid():
+            logger_utility.log_error(f"Invalid stock adjustment: {serializer.errors}")
+            return None, serializer.errors
+
+        deltas = {}
+        if pk is not None:
+            deltas[pk] = serializer.validated_data['delta']
+        else:
+            for index, adjustment in enumerate(serializer.validated_data):
+                if 'id' not in adjustment:
+                    return None, {"message": f"Adjustment {index} is missing an id."}
+                deltas[adjustment['id']] = deltas.get(adjustment['id'], 0) + adjustment['delta']
+        return deltas, None
+
+    def adjustment_error(self, error):
+        """
+        Maps a rejected adjustment to 404 for unknown items or 409 for insufficient stock.
+        """
+        data = {"message": "Stock adjustment rejected.", "missing": error.missing, "insufficient": error.insufficient}
+        status_code = status.HTTP_404_NOT_FOUND if error.missing else status.HTTP_409_CONFLICT
+        return data, status_code
+
+    def adjustment_result(self, quantities, pk=None):
+        if pk is not None:
+            return {"id": pk, "quantity": quantities[pk]}
+        return {"results": [{"id": item_id, "quantity": quantity} for item_id, quantity in quantities.items()]}
+
+
+class StockAdjustment(StockAdjustmentMixin, APIView):
+    """
+    API view for atomically incrementing or decrementing item quantities without a full item update,
+    and for reading an item's quantity at a point in time from the stock ledger.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'POST': ["update_item"],
+        'GET': ["view_item"],
+    }
+    query_budget = {'GET': 3, 'POST': 4}
+
+    def post(self, request, pk=None):
+        """
+        Applies a single `delta` to item `pk`, or a list of `{id, delta}` adjustments when no pk is given.
+        """
+        logger_utility.log_request(request, f"POST /item/{pk}/stock" if pk else "POST /items/stock")
+        deltas, errors = self.get_deltas(request.data, pk)
+        if errors is not None:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            quantities = adjust_stock(deltas, request.user)
+        except StockAdjustmentError as e:
+            return Response(*self.adjustment_error(e))
+
+        data = self.adjustment_result(quantities, pk)
+        logger_utility.log_response(Response(data), "Stock adjusted successfully")
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get(self, request, pk):
+        """
+        Returns the quantity of item `pk` as of the `as_of` timestamp (default: now) from the stock ledger.
+        """
+        logger_utility.log_request(request, f"GET /item/{pk}/stock")
+        as_of = request.query_params.get('as_of')
+        at = parse_datetime(as_of) if as_of else timezone.now()
+        if at is None:
+            return Response({"message": "as_of must be an ISO 8601 datetime."}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+
+        quantity = StockMovement.objects.quantity_as_of(pk, at)
+        if quantity is None:
+            logger_utility.log_error(f"No stock history for item {pk} as of {at.isoformat()}")
+            return Response({"message": "No stock history for this item at that time."}, status=status.HTTP_404_NOT_FOUND)
+        data = {"id": pk, "as_of": at.isoformat(), "quantity": quantity}
+        logger_utility.log_response(Response(data), f"Stock of item {pk} retrieved as of {at.isoformat()}")
+        return Response(data, status=status.HTTP_200_OK)
+
+class StockMovementListing(APIView):
+    """
+    API view for listing the stock ledger of an item, newest first.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'GET': ["view_item"],
+    }
+    query_budget = {'GET': 2}
+
+    def get(self, request, pk):
+        """
+        Retrieves a cursor-paginated page of stock movements recorded for item `pk`.
+        """
+        logger_utility.log_request(request, f"GET /item/{pk}/movements")
+        movements = StockMovement.objects.filter(item_id=pk).select_related('created_by')
+        paginator = KeysetPaginator(('-created_at', '-id'))
+        try:
+            movements, next_cursor = paginator.paginate(movements, request)
+        except InvalidCursor as e:
+            return Response({"message": "Invalid query parameters.", "detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = {"results": StockMovementSerializer(movements, many=True).data, "next_cursor": next_cursor}
+        logger_utility.log_response(Response(data), f"{len(movements)} stock movements listed for item {pk}")
+        return Response(data, status=status.HTTP_200_OK)
+
+class CategorySearch(SearchMixin, APIView):
+    """
+    API view for ranked search over category names.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'GET': ["view_category"],
+    }
+    query_budget = {'GET': 3}
+
+    def get(self, request):
+        """
+        Searches categories by name.
+        """
+        logger_utility.log_request(request, "GET /categories/search")
+        return self.search_response(request, Category, CategorySerializer)
+
+class ItemSearch(SearchMixin, APIView):
+    """
+    API view for ranked search over item names, SKUs and descriptions.
+    """
+    permission_classes = [IsAuthenticated, HasTokenPermissions]
+    required_permissions = {
+        'GET': ["view_item"],
+    }
+    query_budget = {'GET': 3}
+
+    def get(self, request):
+        """
+        Searches items by name, SKU and description.
+        """
+        logger_utility.log_request(request, "GET /items/search")
+        return self.search_response(request, Item, ItemSerializer)
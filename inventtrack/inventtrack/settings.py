@@ -46,6 +46,8 @@ third_party_apps = ['rest_framework', 'rest_framework_simplejwt']
 INSTALLED_APPS = core_apps + project_apps + third_party_apps
 
 MIDDLEWARE = [
+    'common.metrics.MetricsMiddleware',
+    'common.db_router.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.query_budget.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'inventtrack.urls'
@@ -75,6 +78,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'inventtrack.wsgi.application'
 
+# Connections come from Django's psycopg 3 pool, one pool per process shared by WSGI threads and by
+# the threads ASGI runs sync code in; a connection is checked out on first use in a request and
+# returned when the request finishes. With DB_POOL=0, each thread keeps a persistent connection for
+# DB_CONN_MAX_AGE seconds instead. CONN_HEALTH_CHECKS makes the pool (or Django) verify a
+# connection before handing it out.
+DB_POOL = os.environ.get('DB_POOL', '1') == '1'
+
 DATABASES = {
   'default': {
     'ENGINE': 'django.db.backends.postgresql',
@@ -83,9 +93,39 @@ DATABASES = {
     'PASSWORD': 'admin@123',
     'HOST': '127.0.0.1',
     'PORT': '5432',
+    'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+      'pool': {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        # Size to the concurrency of one process (e.g. gunicorn --threads); requests beyond it wait.
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        # Seconds a request waits for a free connection before failing with PoolTimeout.
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+      },
+    } if DB_POOL else {},
   }
 }
 
+# Read replicas, one alias per host in DB_REPLICA_HOSTS (comma-separated), with the primary's
+# credentials and pool options. Tests run them as mirrors of the test database.
+for index, host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica_{index}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['common.db_router.PrimaryReplicaRouter']
+
+# Routing of reads to replicas (common.db_router). Reads stay on the primary for STICKY_SECONDS
+# after a client's write, and replicas lagging more than MAX_LAG_SECONDS (checked every
+# LAG_CHECK_INTERVAL seconds per process) are skipped.
+DATABASE_REPLICATION = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'STICKY_SECONDS': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5')),
+    'MAX_LAG_SECONDS': float(os.environ.get('DB_REPLICA_MAX_LAG_SECONDS', '5')),
+    'LAG_CHECK_INTERVAL': 2,
+}
+
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
@@ -97,6 +137,29 @@ CACHES = {
     }
 }
 
+# Read-through cache layer (common.cache_helpers). Bump SCHEMA_VERSION when a cached representation changes.
+READ_THROUGH_CACHE = {
+    'SCHEMA_VERSION': 3,
+    'TIMEOUT': 60 * 60 * 24,
+    'TIMEOUT_JITTER': 0.1,
+    'NEGATIVE_TIMEOUT': 30,
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 2,
+    # Read counts of tracked namespaces are merged into the shared hot-items map this often (seconds).
+    'ACCESS_FLUSH_INTERVAL': 60,
+    'HOT_KEYS_MAX': 10000,
+}
+
+# Per-process LRU in front of the shared cache. INVALIDATION_BUS is 'redis' (pub/sub on CHANNEL),
+# 'local' (single process, tests) or None to pick based on the default cache backend.
+LOCAL_CACHE = {
+    'ENABLED': True,
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'TIMEOUT': 30,
+    'INVALIDATION_BUS': None,
+    'CHANNEL': 'inventtrack:cache-invalidation',
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -147,62 +210,103 @@ SIMPLE_JWT = {
     "TOKEN_TYPE_CLAIM": "token_type",
 }
 
+INVENTORY_PAGE_SIZE = 50
+INVENTORY_MAX_PAGE_SIZE = 500
+INVENTORY_STREAM_CHUNK_SIZE = 2000
+INVENTORY_BULK_CHUNK_SIZE = 1000
+INVENTORY_BATCH_GET_MAX_KEYS = 500
+INVENTORY_EXPORT_CHUNK_SIZE = 5000
+INVENTORY_IMPORT_CHUNK_SIZE = 5000
+# Export watermarks trail the export start (or the oldest open transaction on PostgreSQL) by this
+# many seconds; keep it above the replica lag limit, and on other databases above the longest write transaction.
+INVENTORY_EXPORT_WATERMARK_LAG = int(os.environ.get('INVENTORY_EXPORT_WATERMARK_LAG', '60'))
+# Cached item responses at least this large are stored gzip-compressed; None disables compression.
+INVENTORY_CACHE_COMPRESS_MIN_BYTES = 1024
+# Warm the most read items in the background on a worker's first request (one worker per deploy,
+# at INVENTORY_CACHE_PRELOAD_RATE items per second). `manage.py warm_item_cache` warms everything.
+INVENTORY_CACHE_PRELOAD = os.environ.get('INVENTORY_CACHE_PRELOAD', '0') == '1'
+INVENTORY_CACHE_PRELOAD_LIMIT = 10000
+INVENTORY_CACHE_PRELOAD_RATE = 2000
+# Fail safe requests whose views run more queries than their declared `query_budget`. Off unless
+# INVENTORY_ENFORCE_QUERY_BUDGETS=1; the test suite turns it on.
+INVENTORY_ENFORCE_QUERY_BUDGETS = os.environ.get('INVENTORY_ENFORCE_QUERY_BUDGETS', '0') == '1'
+# Serve the hot read and stock endpoints with native async views; asgi.py turns this on by default.
+INVENTORY_ASYNC_VIEWS = os.environ.get('INVENTORY_ASYNC_VIEWS', '0') == '1'
+
+# Adds a Server-Timing header (total, db, cache and serializer time) to every response.
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', '1' if DEBUG else '0') == '1'
+# When set, /metrics/ requires this value as a Bearer token. Otherwise only clients whose
+# REMOTE_ADDR is in METRICS_ALLOWED_IPS (loopback by default) may scrape it.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'common.jwt_helpers.StatelessJWTAuthentication',
     )
 }
 
+# Upper bound on validated access tokens kept in each process's LRU; entries expire at the token's exp.
+JWT_CLAIMS_CACHE_SIZE = 10000
+# Seconds a user's is_active flag is trusted for stateless (read-only) requests; 0 disables the check.
+JWT_USER_ACTIVE_CHECK_TTL = 60
+
 LOG_DIR = os.path.join(BASE_DIR, 'inventory_logs')
 
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
+# Log levels and request/response body logging, configurable per environment.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO')
+DJANGO_LOG_LEVEL = os.environ.get('DJANGO_LOG_LEVEL', 'INFO')
+# Fraction of requests whose bodies are logged (error responses are always logged), and their maximum length.
+LOG_BODY_SAMPLE_RATE = float(os.environ.get('LOG_BODY_SAMPLE_RATE', '1.0' if DEBUG else '0.01'))
+LOG_BODY_MAX_CHARS = int(os.environ.get('LOG_BODY_MAX_CHARS', '2048'))
+
+# Records are queued and written as JSON lines by a background thread, so request handling
+# never waits on file I/O or on formatting.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
-        'debug_file': {
-            'level': 'DEBUG',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(LOG_DIR, 'debug.log'),
-            'formatter': 'verbose',
-        },
-        'info_file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(LOG_DIR, 'info.log'),
-            'formatter': 'verbose',
-        },
-        'error_file': {
-            'level': 'ERROR',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(LOG_DIR, 'errors.log'),
-            'formatter': 'verbose',
-        },
-    },
-
-    'formatters': {
-        'verbose': {
-            'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        'queue': {
+            '()': 'common.log_utils.BackgroundQueueHandler',
+            'queue_size': int(os.environ.get('LOG_QUEUE_SIZE', '10000')),
+            'targets': [
+                {
+                    'class': 'logging.FileHandler',
+                    'level': 'DEBUG',
+                    'filename': os.path.join(LOG_DIR, 'debug.log'),
+                },
+                {
+                    'class': 'logging.FileHandler',
+                    'level': 'INFO',
+                    'filename': os.path.join(LOG_DIR, 'info.log'),
+                },
+                {
+                    'class': 'logging.FileHandler',
+                    'level': 'ERROR',
+                    'filename': os.path.join(LOG_DIR, 'errors.log'),
+                },
+            ],
         },
     },
 
     'loggers': {
         '': {
-            'handlers': ['debug_file', 'info_file', 'error_file'],
-            'level': 'DEBUG',
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
             'propagate': True,
         },
         'django': {
-            'handlers': ['info_file', 'error_file'],
-            'level': 'INFO',
+            'handlers': ['queue'],
+            'level': DJANGO_LOG_LEVEL,
             'propagate': False,
         },
         'django.request': {
-            'handlers': ['error_file'],
+            'handlers': ['queue'],
             'level': 'ERROR',
             'propagate': False,
         },
     },
-}
\ No newline at end of file
+}